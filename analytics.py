@@ -0,0 +1,146 @@
+"""
+Analyse van transcripties: woordfrequenties, n-grammen en spreektempo.
+
+Woorden worden één keer naar integer-ids vertaald; daarna is tellen
+vectorwerk in NumPy (`bincount` voor woorden, `np.unique` over n-gram-codes
+voor bi- en trigrammen). Resultaten worden per transcript-hash gecachet,
+zodat een rerun niets herberekent.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from text_utils import tokenize
+from timing import stage
+
+DUTCH_STOPWORDS = frozenset("""
+aan al alles als altijd ander andere ben bij daar dan dat de der deze die dit doch doen
+door dus een eens en er ga gaan gaat ge geen geweest haar had heb hebben heeft hem het
+hier hij hoe hun iemand iets ik in is ja je jij jou jouw kan kon kunnen maar me meer men
+met mij mijn moet na naar niet niets nog nu of om omdat ons onze ook op over reeds te
+tegen toch toen tot u uit uw van veel voor want waren was wat we wel werd wezen wie wij
+wil worden wordt zal ze zei zelf zich zij zijn zo zo'n zonder zou eh ehm uh uhm oké okay
+even gewoon heel echt nou hè hé 's 't 'n 'k 'm 'r 'ie
+""".split())
+
+
+@dataclass
+class TranscriptStats:
+    word_count: int
+    unique_words: int
+    unigrams: list  # (woord, aantal), aflopend
+    bigrams: list  # ("woord woord", aantal)
+    trigrams: list
+    words_per_minute: list = None  # woorden per minuut, alleen met segmenten
+
+
+def _encode(words):
+    """Woorden naar integer-ids (in volgorde van eerste voorkomen) plus vocabulaire."""
+    vocab = {}
+    ids = np.fromiter(
+        (vocab.setdefault(w, len(vocab)) for w in words), dtype=np.int64, count=len(words)
+    )
+    return ids, list(vocab)
+
+
+def _most_common(codes, counts, top_n):
+    """De `top_n` codes met de hoogste telling, aflopend."""
+    if top_n and len(codes) > top_n:
+        part = np.argpartition(-counts, top_n - 1)[:top_n]
+        codes, counts = codes[part], counts[part]
+    order = np.lexsort((codes, -counts))
+    return codes[order], counts[order]
+
+
+def ngram_counts(ids, n, vocab_size, is_stop=None, top_n=20):
+    """
+    Telt n-grammen over de id-reeks. Ieder n-gram wordt één int64-code
+    (basis `vocab_size`), zodat tellen één `np.unique` is. Met `is_stop`
+    tellen n-grammen die met een stopwoord beginnen of eindigen niet mee.
+    Geeft de top-n als lijst van (ids van het n-gram, aantal).
+    """
+    m = len(ids) - n + 1
+    if m <= 0:
+        return []
+    codes = np.zeros(m, dtype=np.int64)
+    for i in range(n):
+        codes = codes * vocab_size + ids[i:i + m]
+    if is_stop is not None:
+        codes = codes[~(is_stop[ids[:m]] | is_stop[ids[n - 1:]])]
+    uniq, counts = np.unique(codes, return_counts=True)
+    uniq, counts = _most_common(uniq, counts, top_n)
+    grams = []
+    for code, count in zip(uniq.tolist(), counts.tolist()):
+        parts = []
+        for _ in range(n):
+            code, last = divmod(code, vocab_size)
+            parts.append(last)
+        grams.append((parts[::-1], count))
+    return grams
+
+
+def words_per_minute(segments):
+    """Aantal woorden (op spaties) per minuut op basis van segment-starttijden."""
+    if not segments:
+        return None
+    starts = np.array([s["start"] for s in segments], dtype=np.float64)
+    counts = np.array([len(s["text"].split()) for s in segments], dtype=np.float64)
+    minutes = (starts // 60).astype(np.int64)
+    return np.bincount(minutes, weights=counts).astype(int).tolist()
+
+
+def analyze(text, segments=None, top_n=20, stopwords=DUTCH_STOPWORDS):
+    """Statistieken voor één transcript (zie `analyze_cached` voor de gecachete variant)."""
+    with stage("analyse") as log:
+        words = tokenize(text)
+        ids, vocab = _encode(words)
+        size = max(len(vocab), 1)
+        is_stop = np.array([w in stopwords for w in vocab], dtype=bool) if stopwords else None
+
+        counts = np.bincount(ids, minlength=len(vocab))
+        candidates = np.flatnonzero(~is_stop) if is_stop is not None else np.arange(len(vocab))
+        top, top_counts = _most_common(candidates, counts[candidates], top_n)
+
+        def joined(n):
+            return [
+                (" ".join(vocab[i] for i in parts), count)
+                for parts, count in ngram_counts(ids, n, size, is_stop, top_n)
+            ]
+
+        log["words"] = len(words)
+        return TranscriptStats(
+            word_count=len(words),
+            unique_words=len(vocab),
+            unigrams=[(vocab[i], c) for i, c in zip(top.tolist(), top_counts.tolist())],
+            bigrams=joined(2),
+            trigrams=joined(3),
+            words_per_minute=words_per_minute(segments),
+        )
+
+
+_CACHE = OrderedDict()
+_CACHE_SIZE = 16
+_LOCK = threading.Lock()
+
+
+def analyze_cached(text, segments=None, top_n=20, use_stopwords=True):
+    """
+    `analyze` met een procesbrede LRU-cache op de hash van het transcript.
+    Segmenten horen bij het transcript; alleen hun aantal en eindtijd gaan
+    mee in de sleutel, zodat een cache-hit geen JSON hoeft te hashen.
+    """
+    span = (len(segments), segments[-1]["end"]) if segments else None
+    key = (hashlib.sha256(text.encode("utf-8")).hexdigest(), span, top_n, use_stopwords)
+    with _LOCK:
+        if key in _CACHE:
+            _CACHE.move_to_end(key)
+            return _CACHE[key]
+    stats = analyze(text, segments, top_n, DUTCH_STOPWORDS if use_stopwords else None)
+    with _LOCK:
+        _CACHE[key] = stats
+        while len(_CACHE) > _CACHE_SIZE:
+            _CACHE.popitem(last=False)
+    return stats
@@ -1,7 +1,15 @@
+import hashlib
 import os
+import time
 import streamlit as st
-import pandas as pd
-from groq import Groq
+
+# Zware modules (groq, pandas, numpy via transcription/enrichment) worden pas
+# geïmporteerd waar ze nodig zijn, zodat Home/Over snel blijven.
+import timing
+from jobs import JobScheduler
+from rate_limit import RateLimitedClient, RateLimiter
+from text_utils import compact_json
+from transcript_cache import TranscriptCache, audio_hash
 
 # ─── Streamlit Page Config ─────────────────────────────────────────────
 st.set_page_config(
@@ -12,6 +20,20 @@ st.set_page_config(
 )
 
 # ─── Groq Client Initialisatie ─────────────────────────────────────────
+@st.cache_resource(show_spinner=False)
+def get_groq_client(key):
+    """Eén client per key en proces, zodat HTTP-verbindingen hergebruikt worden."""
+    from groq import Groq
+    return Groq(api_key=key)
+
+@st.cache_data(ttl=600, show_spinner=False)
+def check_groq_key(key):
+    """
+    Lichte test-call, hoogstens eens per 10 minuten per key.
+    Fouten worden niet gecachet, dus een ongeldige key wordt opnieuw geprobeerd.
+    """
+    return len(get_groq_client(key).models.list().data)
+
 def init_groq_client():
     """
     Initialiseert de Groq-client.
@@ -25,10 +47,9 @@ def init_groq_client():
         st.warning("⚠️ Geen Groq-key gevonden. Transcriptie en verrijken gaan niet werken.")
         return None
     try:
-        client = Groq(api_key=key)
-        # lichte test-call
-        models = client.models.list()
-        st.success(f"API key werkt ✅ – {len(models.data)} modellen beschikbaar")
+        client = get_groq_client(key)
+        count = check_groq_key(key)
+        st.success(f"API key werkt ✅ – {count} modellen beschikbaar")
         return client
     except Exception:
         st.error("❌ Groq API key ongeldig, transcriptie kan mislukken.")
@@ -36,6 +57,76 @@ def init_groq_client():
 
 client = init_groq_client()
 
+# ─── Transcriptie-cache ────────────────────────────────────────────────
+@st.cache_resource
+def get_transcript_cache():
+    """
+    Eén cache-object per proces; de onderliggende SQLite-store wordt
+    gedeeld door alle sessies en processen.
+    """
+    return TranscriptCache()
+
+# ─── Achtergrond-jobs ──────────────────────────────────────────────────
+@st.cache_resource
+def get_scheduler():
+    """Procesbrede scheduler: maximaal 4 jobs tegelijk, gedeeld door alle sessies."""
+    return JobScheduler(max_workers=4)
+
+@st.cache_resource
+def get_rate_limiter():
+    """Procesbrede limieten voor alle Groq-calls (rpm, gelijktijdigheid, 429's)."""
+    return RateLimiter()
+
+api = RateLimitedClient(client, get_rate_limiter()) if client else None
+
+# ─── Tijdmeting per stap ───────────────────────────────────────────────
+@st.cache_resource
+def setup_timing_log():
+    """Timing-records (JSON per regel) naar SPEECH2TEXT_TIMING_LOG of stderr."""
+    timing.configure(os.getenv("SPEECH2TEXT_TIMING_LOG"))
+
+setup_timing_log()
+
+def transcription_job(job, name, data, cache):
+    from transcription import transcribe_audio
+    job.update(message="Transcriberen…")
+    return transcribe_audio(
+        api,
+        name,
+        data,
+        cache=cache,
+        progress=lambda f: job.update(progress=f)
+    )
+
+def enrichment_job(job, transcript, prompt_context, context_format, token_budget):
+    from context_index import get_index
+    from enrichment import MapReduceEnricher
+    job.update(message="Bezig met combineren…")
+    enricher = MapReduceEnricher(
+        api,
+        token_budget=token_budget,
+        context_index=get_index(prompt_context, context_format)
+    )
+    stream = enricher.stream(
+        transcript,
+        prompt_context,
+        progress=lambda f: job.update(progress=f, message=f"Bezig met combineren… {f:.0%}")
+    )
+    for delta in stream:
+        job.append(delta)
+    return stream
+
+@st.fragment(run_every=0.5)
+def job_progress(job_id):
+    """Pollt een lopende job; bij afronding wordt de hele pagina herladen."""
+    job = get_scheduler().get(job_id)
+    if job is None or job.done:
+        st.rerun()
+    st.progress(job.progress, text=job.message or "Bezig…")
+    partial = job.partial
+    if partial:
+        st.write(partial)
+
 # ─── Sidebar Navigatie ─────────────────────────────────────────────────
 st.sidebar.title("🎤 Speech2Text Demo")
 page = st.sidebar.radio(
@@ -61,9 +152,12 @@ if page == "Home":
 # ─── Pagina: Upload & Transcriptie ─────────────────────────────────────
 elif page == "Upload & Transcriptie":
     st.title("📂 Upload je audio + context")
+    from enrichment import DEFAULT_TOKEN_BUDGET
 
     transcript = st.session_state.get("transcript", "")
     context_text = ""
+    prompt_context = ""
+    context_format = "txt"
 
     col1, col2 = st.columns(2)
 
@@ -76,17 +170,55 @@ elif page == "Upload & Transcriptie":
             key="audio_uploader"
         )
         if audio_file and client:
+            started = time.perf_counter()
             data = audio_file.read()
             st.audio(data)
-            st.info("Transcriberen…")
-            try:
-                res = client.audio.transcriptions.create(
-                    model="whisper-large-v3",
-                    file=(audio_file.name, data)
+            # identieke uploads (ook uit andere sessies) delen één lopende job
+            job_key = f"transcribe:{audio_hash(data)}"
+            job_id = st.session_state.get("transcribe_job")
+            job = get_scheduler().get(job_id) if job_id else None
+            if st.session_state.get("transcribe_key") != job_key or job is None:
+                st.session_state["transcribe_key"] = job_key
+                # alleen nieuwe uploads loggen, niet iedere rerun
+                timing.emit("upload", time.perf_counter() - started, bytes=len(data))
+                # cache hier ophalen: de job-thread heeft geen Streamlit-context
+                st.session_state["transcribe_job"] = get_scheduler().submit(
+                    job_key, transcription_job, audio_file.name, data, get_transcript_cache()
+                )
+                job = get_scheduler().get(st.session_state["transcribe_job"])
+            if not job.done:
+                job_progress(job.id)
+            elif job.error:
+                st.error(f"Transcriptie mislukt: {job.error}")
+                # zonder job maakt de volgende run een nieuwe poging aan
+                st.button(
+                    "🔁 Opnieuw proberen",
+                    key="retry_transcribe",
+                    on_click=lambda: get_scheduler().discard(st.session_state.pop("transcribe_job", None)),
                 )
+            else:
+                cache = get_transcript_cache()
+                res = job.result
                 transcript = res.text
                 st.session_state["transcript"] = transcript
-                st.success("Transcriptie afgerond ✅")
+                st.session_state["segments"] = res.segments
+                st.success(
+                    "Transcriptie afgerond ✅ (uit cache)" if res.cached
+                    else "Transcriptie afgerond ✅"
+                )
+                if res.upload:
+                    up = res.upload
+                    saved = 1 - up["sent_bytes"] / max(up["original_bytes"], 1)
+                    st.caption(
+                        f"Upload: {up['original_bytes'] / 1e6:.2f} MB → "
+                        f"{up['sent_bytes'] / 1e6:.2f} MB ({saved:.0%} kleiner), "
+                        f"voorbewerking {up['preprocess_s'] * 1000:.0f} ms"
+                    )
+                stats = cache.stats()
+                st.caption(
+                    f"Cache: {stats['hits']} hits / {stats['misses']} misses – "
+                    f"{stats['entries']} transcripties, {stats['bytes'] / 1024:.0f} kB"
+                )
                 st.code(transcript, language="text")
                 st.download_button(
                     "⬇️ Download (TXT)",
@@ -94,8 +226,6 @@ elif page == "Upload & Transcriptie":
                     file_name="transcript.txt",
                     mime="text/plain"
                 )
-            except Exception as e:
-                st.error(f"Transcriptie mislukt: {e}")
 
     # Kolom 2: Context upload en preview
     with col2:
@@ -108,11 +238,14 @@ elif page == "Upload & Transcriptie":
         if context_file:
             if context_file.type == "application/json":
                 import json as _json
-                context_text = _json.dumps(
-                    _json.load(context_file), ensure_ascii=False, indent=2
-                )
+                context_obj = _json.load(context_file)
+                # leesbaar voor de preview, compact (minder tokens) voor de prompt
+                context_text = _json.dumps(context_obj, ensure_ascii=False, indent=2)
+                prompt_context = compact_json(context_obj)
+                context_format = "json"
             else:
                 context_text = context_file.read().decode("utf-8", errors="ignore")
+                prompt_context = context_text
             st.subheader("📄 Toegevoegde context (preview)")
             st.text_area(
                 "Preview context",
@@ -123,34 +256,60 @@ elif page == "Upload & Transcriptie":
     # Combineer transcriptie en context
     if transcript.strip() and context_text.strip() and client:
         st.divider()
+        token_budget = st.number_input(
+            "Tokenbudget per call",
+            min_value=1000,
+            max_value=128000,
+            value=DEFAULT_TOKEN_BUDGET,
+            step=1000,
+            help="Langere transcripties worden in delen verrijkt en daarna samengevoegd."
+        )
         if st.button("✅ Combineer transcriptie met context"):
-            st.info("Bezig met combineren…")
-            try:
-                enrich = client.chat.completions.create(
-                    model="llama-3.1-8b-instant",
-                    temperature=0.3,
-                    messages=[
-                        {"role": "system", "content": (
-                            "Combineer het transcript met de extra context. "
-                            "Maak er één vloeiende, verbeterde transcriptie van in het Nederlands."
-                        )},
-                        {"role": "user", "content": (
-                            f"Transcript:\n{transcript}\n\nContext:\n{context_text}\n\n"
-                            "Geef de gecombineerde versie als doorlopende tekst."
-                        )}
-                    ]
-                )
-                enriched = enrich.choices[0].message.content
-                st.subheader("🧠 Verrijkte transcriptie")
-                st.write(enriched)
-                st.download_button(
-                    "⬇️ Download verrijkte transcriptie (TXT)",
-                    enriched,
-                    file_name="verrijkte_transcriptie.txt",
-                    mime="text/plain"
+            job_key = "enrich:" + hashlib.sha256(
+                f"{token_budget}\0{transcript}\0{prompt_context}".encode("utf-8")
+            ).hexdigest()
+            st.session_state.pop("enriched", None)
+            st.session_state["enrich_job"] = get_scheduler().submit(
+                job_key, enrichment_job,
+                transcript, prompt_context, context_format, int(token_budget)
+            )
+
+        job_id = st.session_state.get("enrich_job")
+        job = get_scheduler().get(job_id) if job_id else None
+        if job is not None and not job.done:
+            st.subheader("🧠 Verrijkte transcriptie")
+            job_progress(job.id)
+        elif job is not None and job.error:
+            st.session_state.pop("enrich_job", None)
+            st.error(f"Verrijken mislukt: {job.error}")
+        elif job is not None:
+            st.session_state.pop("enrich_job", None)
+            st.session_state["enriched"] = job.result.text
+            st.session_state["enrich_stats"] = job.result.stats
+        if st.session_state.get("enriched"):
+            st.subheader("🧠 Verrijkte transcriptie")
+            st.write(st.session_state["enriched"])
+
+        # Pas na een volledige stream: statistieken + download
+        enriched = st.session_state.get("enriched")
+        if enriched:
+            stats = st.session_state["enrich_stats"]
+            if stats.ttft_s is not None:
+                rate = f", {stats.tokens_per_s:.0f} tokens/s" if stats.tokens_per_s else ""
+                st.caption(
+                    f"Eerste token na {stats.ttft_s:.2f} s – "
+                    f"{stats.tokens} tokens in {stats.total_s:.2f} s{rate}"
                 )
-            except Exception as e:
-                st.error(f"Verrijken mislukt: {e}")
+            st.caption(
+                f"Context: gemiddeld {stats.context_tokens} van "
+                f"{stats.context_available} tokens per call meegestuurd"
+            )
+            st.download_button(
+                "⬇️ Download verrijkte transcriptie (TXT)",
+                enriched,
+                file_name="verrijkte_transcriptie.txt",
+                mime="text/plain"
+            )
 
 # ─── Pagina: Analyse ───────────────────────────────────────────────────
 elif page == "Analyse":
@@ -163,20 +322,35 @@ elif page == "Analyse":
         )
         st.stop()
 
-    words = [w.lower().strip(".,!?") for w in transcript.split()]
-    st.metric("Aantal woorden", len(words))
+    import pandas as pd
+    from analytics import analyze_cached
 
-    # Bereken woordfrequenties
-    freq = {}
-    for w in words:
-        freq[w] = freq.get(w, 0) + 1
-    freq_df = pd.DataFrame.from_dict(
-        freq, orient="index", columns=["aantal"]
-    ).sort_values("aantal", ascending=False)
+    use_stopwords = st.toggle("Stopwoorden negeren", value=True)
+    stats = analyze_cached(
+        transcript,
+        st.session_state.get("segments"),
+        use_stopwords=use_stopwords
+    )
+    c1, c2 = st.columns(2)
+    c1.metric("Aantal woorden", stats.word_count)
+    c2.metric("Unieke woorden", stats.unique_words)
 
+    freq_df = pd.DataFrame(stats.unigrams, columns=["woord", "aantal"]).set_index("woord")
     with st.expander("📑 Woordfrequentie top-20"):
-        st.bar_chart(freq_df["aantal"].head(20))
-        st.table(freq_df.head(20))
+        st.bar_chart(freq_df["aantal"])
+        st.table(freq_df)
+
+    with st.expander("🔗 Veelvoorkomende woordcombinaties"):
+        c1, c2 = st.columns(2)
+        c1.table(pd.DataFrame(stats.bigrams, columns=["bigram", "aantal"]).set_index("bigram"))
+        c2.table(pd.DataFrame(stats.trigrams, columns=["trigram", "aantal"]).set_index("trigram"))
+
+    if stats.words_per_minute:
+        with st.expander("⏱️ Spreektempo (woorden per minuut)"):
+            st.line_chart(pd.DataFrame(
+                {"woorden": stats.words_per_minute},
+                index=pd.RangeIndex(len(stats.words_per_minute), name="minuut")
+            ))
 
 # ─── Pagina: Over ──────────────────────────────────────────────────────
 elif page == "Over":
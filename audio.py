@@ -0,0 +1,252 @@
+"""
+Audio-hulpfuncties op basis van NumPy.
+
+WAV-bestanden decoderen/encoderen, opnames normaliseren (mono, 16 kHz,
+compact formaat) en stille momenten zoeken, zodat lange opnames op
+natuurlijke pauzes in stukken gesplitst kunnen worden.
+"""
+import io
+import shutil
+import subprocess
+import wave
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    import soundfile as sf
+except ImportError:  # optioneel: zonder soundfile wordt 16-bit WAV verstuurd
+    sf = None
+
+TARGET_RATE = 16000  # Whisper werkt intern op 16 kHz mono
+
+
+@dataclass
+class AudioClip:
+    samples: np.ndarray  # int16, vorm (frames, kanalen)
+    rate: int
+
+    @property
+    def frames(self):
+        return self.samples.shape[0]
+
+    @property
+    def channels(self):
+        return self.samples.shape[1]
+
+    @property
+    def duration(self):
+        return self.frames / self.rate
+
+    def slice(self, start, stop):
+        """Deel van de clip tussen frame `start` en `stop`."""
+        return AudioClip(self.samples[start:stop], self.rate)
+
+
+def is_wav(data):
+    return data[:4] == b"RIFF" and data[8:12] == b"WAVE"
+
+
+def decode_wav(data):
+    """Leest PCM-WAV (8/16/24/32 bit) in als int16-samples."""
+    try:
+        with wave.open(io.BytesIO(data), "rb") as wf:
+            channels = wf.getnchannels()
+            width = wf.getsampwidth()
+            rate = wf.getframerate()
+            raw = wf.readframes(wf.getnframes())
+    except (wave.Error, EOFError, RuntimeError) as e:  # RuntimeError: kapotte chunk-grootte
+        raise ValueError(f"Geen leesbaar PCM-WAV-bestand: {e}") from e
+
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.int16) - 128) << 8
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2")
+    elif width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = ((b[:, 0] << 8 | b[:, 1] << 16 | b[:, 2] << 24) >> 16).astype(np.int16)
+    elif width == 4:
+        samples = (np.frombuffer(raw, dtype="<i4") >> 16).astype(np.int16)
+    else:
+        raise ValueError(f"Niet-ondersteunde sample-breedte: {width} bytes")
+    return AudioClip(samples.reshape(-1, channels), rate)
+
+
+def encode_wav(clip):
+    """Schrijft een clip als 16-bit PCM-WAV."""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(clip.channels)
+        wf.setsampwidth(2)
+        wf.setframerate(clip.rate)
+        wf.writeframes(np.ascontiguousarray(clip.samples, dtype="<i2").tobytes())
+    return buf.getvalue()
+
+
+def decode(data):
+    """
+    Decodeert een upload naar een AudioClip.
+    1) PCM-WAV via de standaardbibliotheek
+    2) Fallback op soundfile (FLAC/OGG/...) of ffmpeg (mp3/m4a)
+    Geeft None als geen van beide het formaat kan lezen.
+    """
+    if is_wav(data):
+        try:
+            return decode_wav(data)
+        except ValueError:
+            pass
+    if sf is not None:
+        try:
+            samples, rate = sf.read(io.BytesIO(data), dtype="int16", always_2d=True)
+            return AudioClip(samples, rate)
+        except Exception:
+            pass
+    if shutil.which("ffmpeg"):
+        proc = subprocess.run(
+            ["ffmpeg", "-v", "error", "-i", "pipe:0", "-f", "wav", "-acodec", "pcm_s16le", "pipe:1"],
+            input=data,
+            capture_output=True,
+        )
+        if proc.returncode == 0:
+            return decode_wav(proc.stdout)
+    return None
+
+
+def to_mono(clip, block=1 << 18):
+    """Downmix naar één kanaal (gemiddelde van alle kanalen), per blok."""
+    if clip.channels == 1:
+        return clip
+    mono = np.empty((clip.frames, 1), dtype=np.int16)
+    for start in range(0, clip.frames, block):
+        part = clip.samples[start:start + block].astype(np.float32)
+        mono[start:start + block] = np.round(part.mean(axis=1, keepdims=True))
+    return AudioClip(mono, clip.rate)
+
+
+def _lowpass(cutoff, taps):
+    """Windowed-sinc laagdoorlaatfilter; `cutoff` als fractie van de samplerate."""
+    n = np.arange(taps) - (taps - 1) / 2
+    h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+    return (h / h.sum()).astype(np.float32)
+
+
+def _filter_at(x, h, idx, block=1 << 16):
+    """Gefilterd 1-D signaal `x`, alleen berekend op de posities `idx`."""
+    half = (len(h) - 1) // 2
+    windows = sliding_window_view(np.pad(x, (half, len(h) - 1 - half)), len(h))
+    out = np.empty(len(idx), dtype=np.float32)
+    for start in range(0, len(idx), block):
+        out[start:start + block] = windows[idx[start:start + block]] @ h
+    return out
+
+
+def resample(clip, rate, taps=63, block=1 << 16):
+    """
+    Zet de samplerate om naar `rate`.
+    Bij downsampling wordt eerst anti-aliasing gefilterd, maar alleen op de
+    posities die nodig zijn (polyfase); tussenliggende posities worden
+    lineair geïnterpoleerd. Er wordt per blok van `block` uitvoer-frames
+    gerekend (met een filtermarge aan beide kanten), zodat het geheugen
+    niet met de lengte van de opname meegroeit.
+    """
+    if clip.rate == rate or clip.frames == 0:
+        return clip
+    out_frames = int(clip.frames * rate // clip.rate)
+    step = clip.rate / rate
+    h = _lowpass(0.45 * rate / clip.rate, taps) if rate < clip.rate else None
+    margin = (taps - 1) // 2 + 2 if h is not None else 2
+
+    out = np.empty((out_frames, clip.channels), dtype=np.int16)
+    for start in range(0, out_frames, block):
+        pos = np.arange(start, min(start + block, out_frames)) * step
+        i0 = np.floor(pos).astype(np.int64)
+        frac = (pos - i0).astype(np.float32)
+        interpolate = bool(frac.any())
+        lo = max(int(i0[0]) - margin, 0)
+        hi = min(int(i0[-1]) + margin, clip.frames)
+        i0 -= lo
+        i1 = np.minimum(i0 + 1, clip.frames - 1 - lo) if interpolate else None
+        for ch in range(clip.channels):
+            x = clip.samples[lo:hi, ch].astype(np.float32)
+            if h is not None:
+                y0 = _filter_at(x, h, i0)
+                y1 = _filter_at(x, h, i1) if interpolate else None
+            else:
+                y0 = x[i0]
+                y1 = x[i1] if interpolate else None
+            y = y0 + (y1 - y0) * frac if interpolate else y0
+            out[start:start + len(pos), ch] = np.clip(np.round(y), -32768, 32767)
+    return AudioClip(out, rate)
+
+
+def codec():
+    """Compactste beschikbare formaat: FLAC met soundfile, anders WAV."""
+    return "flac" if sf is not None else "wav"
+
+
+def encode(clip, fmt=None):
+    """Encodeert een clip als FLAC of 16-bit WAV."""
+    fmt = fmt or codec()
+    if fmt == "flac":
+        if sf is None:
+            raise ValueError("FLAC vereist het pakket soundfile (pip install soundfile)")
+        buf = io.BytesIO()
+        sf.write(buf, clip.samples, clip.rate, format="FLAC", subtype="PCM_16")
+        return buf.getvalue()
+    return encode_wav(clip)
+
+
+@dataclass
+class NormalizedAudio:
+    clip: AudioClip
+    data: bytes
+    fmt: str
+
+
+def normalize(data, rate=TARGET_RATE, fmt=None):
+    """
+    Decodeert, downmixt naar mono, resamplet naar `rate` en encodeert
+    compact. Geeft None als het formaat niet gedecodeerd kan worden.
+    """
+    clip = decode(data)
+    if clip is None:
+        return None
+    clip = to_mono(clip)  # los toewijzen: de meerkanaals-versie kan dan al weg
+    clip = resample(clip, rate)
+    fmt = fmt or codec()
+    return NormalizedAudio(clip, encode(clip, fmt), fmt)
+
+
+def frame_energy(clip, frame_s=0.02):
+    """RMS-energie per frame van `frame_s` seconden (kanalen gemiddeld)."""
+    hop = max(1, int(clip.rate * frame_s))
+    n = clip.frames // hop
+    mono = clip.samples[: n * hop].astype(np.float32).mean(axis=1)
+    return np.sqrt((mono.reshape(n, hop) ** 2).mean(axis=1)), hop
+
+
+def split_points(clip, max_frames, search_frames, frame_s=0.02):
+    """
+    Grenzen (in frames) waarop de clip gesplitst wordt.
+    Ieder stuk is hoogstens `max_frames` lang; binnen de laatste
+    `search_frames` van dat venster wordt het stilste frame als knip gekozen.
+    """
+    bounds = [0]
+    if clip.frames <= max_frames:
+        return bounds + [clip.frames]
+
+    energy, hop = frame_energy(clip, frame_s)
+    while clip.frames - bounds[-1] > max_frames:
+        start = bounds[-1]
+        hi = start + max_frames
+        lo = max(hi - search_frames, start + 1)
+        f_lo, f_hi = -(-lo // hop), min(hi // hop, len(energy))
+        if f_hi > f_lo:
+            quietest = f_lo + int(np.argmin(energy[f_lo:f_hi]))
+            cut = min(quietest * hop + hop // 2, hi)
+        else:
+            cut = hi
+        bounds.append(cut)
+    bounds.append(clip.frames)
+    return bounds
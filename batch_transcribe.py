@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Batch-transcriptie van een map met opnames, zonder UI.
+
+Iedere afgeronde opname komt als één JSON-regel in een manifest (JSONL).
+Na een crash of onderbreking slaat een nieuwe run de bestanden uit het
+manifest over. Gebruikt hetzelfde codepad als de app (`transcribe_audio`,
+inclusief cache en rate-limiting).
+
+    python batch_transcribe.py archief/ --manifest archief/manifest.jsonl --workers 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tomllib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from rate_limit import RateLimitedClient, RateLimiter
+from transcript_cache import TranscriptCache, audio_hash
+from transcription import DEFAULT_MODEL, transcribe_audio
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg")
+
+
+def get_api_key():
+    """
+    Zoekt de Groq-key.
+    1) Omgevingsvariabele GROQ_API_KEY
+    2) Fallback op .streamlit/secrets.toml
+    """
+    key = os.getenv("GROQ_API_KEY", "").strip()
+    if key:
+        return key
+    secrets_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".streamlit", "secrets.toml")
+    if os.path.exists(secrets_path):
+        with open(secrets_path, "rb") as f:
+            return tomllib.load(f).get("groq", {}).get("api_key", "").strip() or None
+    return None
+
+
+def find_audio(directory):
+    """Alle audiobestanden onder `directory`, gesorteerd."""
+    found = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(AUDIO_EXTENSIONS):
+                found.append(os.path.join(root, name))
+    return sorted(found)
+
+
+def load_manifest(path):
+    """(pad, model)-paren die al in het manifest staan; andere regels tellen niet mee."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                done.add((record["path"], record["model"]))
+            except (ValueError, KeyError, TypeError):
+                continue
+    return done
+
+
+def repair_manifest(path):
+    """Knipt een half geschreven laatste regel (na een crash) van het manifest af."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def transcribe_file(client, path, root, model, cache):
+    """Transcribeert één bestand en geeft de manifest-regel."""
+    with open(path, "rb") as f:
+        data = f.read()
+    started = time.perf_counter()
+    res = transcribe_audio(client, os.path.basename(path), data, model=model, cache=cache)
+    return {
+        "path": os.path.relpath(path, root),
+        "hash": audio_hash(data),
+        "duration": res.duration,
+        "model": model,
+        "latency": round(time.perf_counter() - started, 3),
+        "cached": res.cached,
+        "text": res.text,
+    }
+
+
+def run_batch(client, directory, manifest, workers=4, model=DEFAULT_MODEL, cache=None, log=print):
+    """
+    Transcribeert alle nog niet verwerkte bestanden in `directory`.
+    Geeft een samenvatting (aantallen en doorvoer) terug.
+    """
+    repair_manifest(manifest)
+    done = load_manifest(manifest)
+    found = find_audio(directory)
+    todo = [p for p in found if (os.path.relpath(p, directory), model) not in done]
+    skipped = len(found) - len(todo)
+    log(f"{len(todo)} te transcriberen, {skipped} al in manifest")
+
+    started = time.perf_counter()
+    ok, failed, audio_s = 0, 0, 0.0
+    with open(manifest, "a", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(transcribe_file, client, p, directory, model, cache): p
+            for p in todo
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                record = future.result()
+            except Exception as e:
+                failed += 1
+                log(f"❌ {path}: {e}")
+                continue
+            # direct wegschrijven, zodat een crash geen afgerond werk kost
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+            ok += 1
+            audio_s += record["duration"] or 0.0
+            log(f"✅ {record['path']} ({record['latency']:.1f} s)")
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "files": ok,
+        "failed": failed,
+        "skipped": skipped,
+        "elapsed_s": elapsed,
+        "files_per_min": ok / elapsed * 60 if elapsed > 0 else 0.0,
+        "audio_s_per_s": audio_s / elapsed if elapsed > 0 else 0.0,
+    }
+    log(
+        f"Klaar: {ok} bestanden in {elapsed:.1f} s – "
+        f"{summary['files_per_min']:.1f} bestanden/min, "
+        f"{summary['audio_s_per_s']:.1f} audio-seconden/s"
+        + (f", {failed} mislukt" if failed else "")
+    )
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-transcriptie met hervatbaar JSONL-manifest.")
+    parser.add_argument("directory", help="map met opnames (wordt recursief doorzocht)")
+    parser.add_argument("--manifest", help="JSONL-manifest (standaard: <map>/manifest.jsonl)")
+    parser.add_argument("--workers", type=int, default=4, help="bestanden tegelijk (standaard: 4)")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--no-cache", action="store_true", help="transcriptie-cache niet gebruiken")
+    args = parser.parse_args(argv)
+
+    key = get_api_key()
+    if not key:
+        print("🚨 Geen API key gevonden. Zet GROQ_API_KEY of vul `.streamlit/secrets.toml` in.")
+        return 1
+
+    from groq import Groq
+
+    client = RateLimitedClient(Groq(api_key=key), RateLimiter())
+    summary = run_batch(
+        client,
+        args.directory,
+        args.manifest or os.path.join(args.directory, "manifest.jsonl"),
+        workers=args.workers,
+        model=args.model,
+        cache=None if args.no_cache else TranscriptCache(),
+    )
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
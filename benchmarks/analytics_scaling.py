@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark voor de Analyse-pagina: oude aanpak (split + dict-lus +
+DataFrame-sort) tegen `analytics.analyze`, plus een cache-hit, voor
+oplopende transcriptlengtes.
+
+    python benchmarks/analytics_scaling.py --sizes 10000 100000 500000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import analyze, analyze_cached  # noqa: E402
+
+VOCAB = (
+    "de het een en van ik je dat is niet op te zijn we vergadering agenda "
+    "besluit actiepunt begroting planning project klant team overleg "
+    "voorstel financiën café één zo'n e-mail notulen rapport vraag antwoord"
+).split()
+
+
+def synthetic(n_words, seed=0):
+    """Transcript van `n_words` woorden met segmenten van ~10 woorden (3 s)."""
+    rng = random.Random(seed)
+    words = rng.choices(VOCAB, k=n_words)
+    segments = [
+        {"start": i * 0.3, "end": (i + 10) * 0.3, "text": " ".join(words[i:i + 10]) + "."}
+        for i in range(0, n_words, 10)
+    ]
+    return " ".join(s["text"] for s in segments), segments
+
+
+def old_analysis(transcript):
+    """De oorspronkelijke Analyse-pagina, zonder de Streamlit-calls."""
+    import pandas as pd
+
+    words = [w.lower().strip(".,!?") for w in transcript.split()]
+    freq = {}
+    for w in words:
+        freq[w] = freq.get(w, 0) + 1
+    return pd.DataFrame.from_dict(freq, orient="index", columns=["aantal"]).sort_values(
+        "aantal", ascending=False
+    )
+
+
+def timed(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Schaling van de transcript-analyse.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    args = parser.parse_args(argv)
+
+    print(f"{'woorden':>9} {'oud (1-gram)':>13} {'nieuw (1-3-gram+tempo)':>23} {'cache-hit':>10}")
+    for n in args.sizes:
+        text, segments = synthetic(n)
+        old = timed(old_analysis, text)
+        new = timed(analyze, text, segments)
+        analyze_cached(text, segments)
+        hit = timed(analyze_cached, text, segments)
+        print(f"{n:>9} {old * 1000:>10.0f} ms {new * 1000:>20.0f} ms {hit * 1000:>7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
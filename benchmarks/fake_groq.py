@@ -0,0 +1,212 @@
+"""
+Lokale stand-in voor de Groq-API, zodat benchmarks geen credits kosten.
+
+Start een HTTP-server op een vrije poort; zet `GROQ_BASE_URL` op
+`server.base_url` en iedere Groq-client praat ermee. Ondersteunt
+`/models`, Whisper-transcripties (verbose_json) en chat completions
+(ook gestreamd), met instelbare latency, 429's en antwoordgroottes.
+"""
+import json
+import random
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = (
+    "de vergadering begint om negen uur en het projectteam bespreekt de planning "
+    "voor het volgende kwartaal met aandacht voor budget risico's en klanten"
+).split()
+
+
+def audio_seconds(body):
+    """Duur van de WAV of FLAC in een multipart-body; anders een schatting (16 kHz mono)."""
+    i = body.find(b"fLaC")
+    if i >= 0 and len(body) >= i + 26:
+        # STREAMINFO: 20 bits samplerate, 3 bits kanalen, 5 bits bps, 36 bits samples
+        info = int.from_bytes(body[i + 18:i + 26], "big")
+        rate, frames = info >> 44, info & ((1 << 36) - 1)
+        if rate and frames:
+            return frames / rate
+    i = body.find(b"RIFF")
+    if i >= 0 and body[i + 8:i + 12] == b"WAVE":
+        byte_rate = struct.unpack_from("<I", body, i + 28)[0]
+        j = body.find(b"data", i + 12)
+        if byte_rate and j >= 0:
+            return struct.unpack_from("<I", body, j + 4)[0] / byte_rate
+    return len(body) / 32000
+
+
+class FakeGroq:
+    """
+    Gesimuleerde API.
+
+    - `latency_s`: vaste wachttijd per request (vóór het antwoord)
+    - `token_delay_s`: tijd tussen gestreamde tokens
+    - `rate_429`: kans per POST op een 429 met `retry-after: retry_after_s`
+    - `words_per_s`: woorden per seconde audio in transcripties
+    - `completion_tokens`: lengte van chat-antwoorden in tokens
+
+        with FakeGroq(latency_s=0.15) as server:
+            os.environ["GROQ_BASE_URL"] = server.base_url
+
+    Tellers: `requests`, `bytes_received` (request-bodies), `throttled`.
+    """
+
+    def __init__(
+        self,
+        latency_s=0.1,
+        token_delay_s=0.0,
+        rate_429=0.0,
+        retry_after_s=0.05,
+        words_per_s=2.5,
+        completion_tokens=64,
+        seed=0,
+    ):
+        self.latency_s = latency_s
+        self.token_delay_s = token_delay_s
+        self.rate_429 = rate_429
+        self.retry_after_s = retry_after_s
+        self.words_per_s = words_per_s
+        self.completion_tokens = completion_tokens
+        self.requests = 0
+        self.bytes_received = 0
+        self.throttled = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _json(self, payload, status=200, headers=None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                fake._hit(0)
+                if self.path.rstrip("/").endswith("/models"):
+                    self._json({"object": "list", "data": [
+                        {"id": m, "object": "model", "created": 0, "owned_by": "fake"}
+                        for m in ("whisper-large-v3", "llama-3.1-8b-instant")
+                    ]})
+                else:
+                    self._json({"error": {"message": "not found"}}, status=404)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("content-length", 0)))
+                fake._hit(len(body))
+                if fake._throttle():
+                    self._json(
+                        {"error": {"message": "rate limit reached", "type": "tokens", "code": "rate_limit_exceeded"}},
+                        status=429,
+                        headers={"retry-after": str(fake.retry_after_s)},
+                    )
+                elif self.path.endswith("/audio/transcriptions"):
+                    self._json(fake.transcription(audio_seconds(body)))
+                elif self.path.endswith("/chat/completions"):
+                    request = json.loads(body)
+                    if request.get("stream"):
+                        self._stream(request.get("model", ""))
+                    else:
+                        self._json(fake.completion(request.get("model", "")))
+                else:
+                    self._json({"error": {"message": "not found"}}, status=404)
+
+            def _stream(self, model):
+                self.send_response(200)
+                self.send_header("content-type", "text/event-stream")
+                self.send_header("connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                for chunk in fake.chunks(model):
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    time.sleep(fake.token_delay_s)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _hit(self, size):
+        with self._lock:
+            self.requests += 1
+            self.bytes_received += size
+        time.sleep(self.latency_s)
+
+    def _throttle(self):
+        with self._lock:
+            hit = self._random.random() < self.rate_429
+            self.throttled += hit
+        return hit
+
+    def _text(self, n):
+        return " ".join(WORDS[i % len(WORDS)] for i in range(n))
+
+    def transcription(self, seconds):
+        """verbose_json met segmenten van maximaal 5 seconden."""
+        segments, start = [], 0.0
+        while start < seconds:
+            end = min(seconds, start + 5.0)
+            text = self._text(max(1, round((end - start) * self.words_per_s)))
+            segments.append({"id": len(segments), "start": start, "end": end, "text": " " + text})
+            start = end
+        return {
+            "task": "transcribe",
+            "language": "dutch",
+            "duration": seconds,
+            "text": "".join(s["text"] for s in segments).strip(),
+            "segments": segments,
+        }
+
+    def _usage(self):
+        return {"prompt_tokens": 0, "completion_tokens": self.completion_tokens,
+                "total_tokens": self.completion_tokens}
+
+    def completion(self, model):
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self._text(self.completion_tokens)},
+                "finish_reason": "stop",
+            }],
+            "usage": self._usage(),
+        }
+
+    def chunks(self, model):
+        """Eén chunk per token; het laatste bevat `x_groq.usage`, zoals bij Groq."""
+        base = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+        words = self._text(self.completion_tokens).split()
+        for i, word in enumerate(words):
+            delta = {"content": word if i == 0 else " " + word}
+            yield {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+        yield {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+               "x_groq": {"id": "req-fake", "usage": self._usage()}}
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark van de pijplijn tegen een gesimuleerde Groq-API.
+
+Per iteratie en per opname: transcriptie (voorbewerking + API-calls, zonder
+cache), contextindex, verrijking (map-reduce of één stream) en analyse. De
+tijden komen uit dezelfde timing-records die de app logt; gerapporteerd
+worden p50/p95 per stap, verstuurde bytes, 429's en de geheugenpiek. De
+geheugenpiek wordt in een aparte run gemeten: tracemalloc vertraagt alles
+en hoort niet in de gemeten iteraties.
+
+    python benchmarks/pipeline.py --iterations 10 --latency 0.05 --rate-429 0.1
+    python benchmarks/pipeline.py --repeat 20 --token-budget 1500
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from fake_groq import WORDS, FakeGroq
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from audio import AudioClip, decode_wav, encode_wav  # noqa: E402
+from rate_limit import RateLimitedClient, RateLimiter  # noqa: E402
+from timing import TimingCollector, stage  # noqa: E402
+
+INPUTS = ("sample.wav", "Uw opname 6.wav")
+
+
+def load_input(path, repeat=1):
+    """Leest een WAV en plakt hem `repeat` keer achter elkaar (grotere uploads)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if repeat <= 1:
+        return data
+    clip = decode_wav(data)
+    return encode_wav(AudioClip(np.tile(clip.samples, (repeat, 1)), clip.rate))
+
+
+def glossary(entries):
+    """Synthetisch JSON-contextbestand met `entries` begrippen."""
+    return json.dumps({
+        f"{WORDS[i % len(WORDS)]}-{i}": f"Toelichting bij {WORDS[i % len(WORDS)]} in project {i}."
+        for i in range(entries)
+    }, ensure_ascii=False)
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else float("nan")
+
+
+def run_once(client, name, data, context, token_budget):
+    from analytics import analyze
+    from context_index import get_index
+    from enrichment import MapReduceEnricher
+    from transcription import transcribe_audio
+
+    with stage("pipeline", input=name):
+        result = transcribe_audio(client, name, data, model="whisper-large-v3")
+        enricher = MapReduceEnricher(
+            client, token_budget=token_budget, context_index=get_index(context, "json")
+        )
+        for _ in enricher.stream(result.text, context):
+            pass
+        analyze(result.text, result.segments)
+
+
+def memory_peak(client, inputs, context, token_budget):
+    """Hoogste tracemalloc-piek over één (ongetimede) run per opname."""
+    peak = 0
+    tracemalloc.start()
+    try:
+        for name, data in inputs:
+            tracemalloc.reset_peak()
+            run_once(client, name, data, context, token_budget)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def report(collector, counters, peak_bytes, elapsed, out=sys.stdout):
+    rows = sorted(collector.durations().items())
+    width = max(len(name) for name, _ in rows)
+    print(f"\n{'stap'.ljust(width)}  {'n':>5}  {'p50 ms':>9}  {'p95 ms':>9}", file=out)
+    for name, values in rows:
+        print(
+            f"{name.ljust(width)}  {len(values):>5}  "
+            f"{percentile(values, 50):>9.1f}  {percentile(values, 95):>9.1f}",
+            file=out,
+        )
+    sent = sum(r.get("bytes", 0) for r in collector.records if r["stage"] == "transcribe_request")
+    print(
+        f"\nverstuurde audio (alle iteraties): {sent / 1e6:.2f} MB, "
+        f"totaal naar API: {counters['bytes'] / 1e6:.2f} MB in {counters['requests']} requests\n"
+        f"429's: {counters['throttled']} van de server, {counters['retried']} opgevangen door de RateLimiter\n"
+        f"geheugenpiek (tracemalloc, aparte run): {peak_bytes / 1e6:.1f} MB\n"
+        f"totale tijd: {elapsed:.1f} s",
+        file=out,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="gesimuleerde API-latency (s)")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="tijd per gestreamd token (s)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="kans op een 429 per request")
+    parser.add_argument("--retry-after", type=float, default=0.05, help="retry-after bij een 429 (s)")
+    parser.add_argument("--words-per-s", type=float, default=2.5, help="woorden per seconde audio")
+    parser.add_argument("--completion-tokens", type=int, default=64, help="lengte chat-antwoorden")
+    parser.add_argument("--repeat", type=int, default=1, help="audio n keer herhalen (grotere payloads)")
+    parser.add_argument("--context-entries", type=int, default=200, help="begrippen in de context")
+    parser.add_argument("--token-budget", type=int, default=6000)
+    parser.add_argument("--log", help="timing-records ook als JSONL wegschrijven")
+    args = parser.parse_args(argv)
+
+    inputs = [(name, load_input(os.path.join(ROOT, name), args.repeat)) for name in INPUTS]
+    context = glossary(args.context_entries)
+
+    with FakeGroq(
+        latency_s=args.latency,
+        token_delay_s=args.token_delay,
+        rate_429=args.rate_429,
+        retry_after_s=args.retry_after,
+        words_per_s=args.words_per_s,
+        completion_tokens=args.completion_tokens,
+    ) as server:
+        from groq import Groq
+
+        # zelfde wrapper als in de app: alleen de RateLimiter doet retries
+        limiter = RateLimiter(audio_rpm=6000, chat_rpm=6000, backoff_s=0.05)
+        client = RateLimitedClient(Groq(api_key="benchmark", base_url=server.base_url), limiter)
+
+        started = time.perf_counter()
+        with TimingCollector() as collector:
+            for i in range(args.iterations):
+                for name, data in inputs:
+                    run_once(client, name, data, context, args.token_budget)
+                print(f"iteratie {i + 1}/{args.iterations} klaar", file=sys.stderr)
+        elapsed = time.perf_counter() - started
+        counters = {
+            "bytes": server.bytes_received,
+            "requests": server.requests,
+            "throttled": server.throttled,
+            "retried": limiter.throttled,
+        }
+        peak = memory_peak(client, inputs, context, args.token_budget)
+
+    print(
+        f"{args.iterations} iteraties × {len(inputs)} opnames "
+        f"({', '.join(f'{n}: {len(d) / 1e6:.2f} MB' for n, d in inputs)}), "
+        f"latency {args.latency * 1000:.0f} ms, 429-kans {args.rate_429:.0%}"
+    )
+    report(collector, counters, peak, elapsed)
+    if args.log:
+        with open(args.log, "w", encoding="utf-8") as f:
+            for record in collector.records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Meet de opstarttijd van de Streamlit-app tegen een gesimuleerde Groq-API.
+
+- cold: eerste run in een vers proces (imports, client, key-check)
+- warm: mediaan van de reruns daarna (zoals na iedere klik op een widget)
+
+    python benchmarks/startup.py --page Home --runs 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from fake_groq import FakeGroq
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    parser.add_argument("--page", default="Home")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.15, help="gesimuleerde API-latency (s)")
+    args = parser.parse_args(argv)
+
+    with FakeGroq(latency_s=args.latency) as server:
+        os.environ["GROQ_API_KEY"] = "benchmark"
+        os.environ["GROQ_BASE_URL"] = server.base_url
+        os.chdir(os.path.dirname(os.path.abspath(args.app)))
+        sys.path.insert(0, os.getcwd())
+
+        from streamlit.testing.v1 import AppTest
+
+        at = AppTest.from_file(os.path.abspath(args.app), default_timeout=60)
+        started = time.perf_counter()
+        at.run()
+        cold = time.perf_counter() - started
+        if args.page != "Home":
+            at.sidebar.radio[0].set_value(args.page)
+
+        warm = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            at.run()
+            warm.append(time.perf_counter() - started)
+        if at.exception:
+            print("⚠️", at.exception[0].value)
+
+    print(
+        f"{args.page}: cold {cold * 1000:.0f} ms, "
+        f"warm p50 {statistics.median(warm) * 1000:.1f} ms, "
+        f"API-requests {server.requests} in {args.runs + 1} runs"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Lokale zoekindex (BM25) over het context-bestand.
+
+Het context-bestand wordt opgeknipt in passages (alinea's of JSON-entries).
+Per transcript-deel gaan alleen de meest relevante passages mee in de prompt.
+De index is puur NumPy, zonder externe dienst, en wordt per bestand één
+keer gebouwd en op hash gecachet.
+"""
+import hashlib
+import json
+import threading
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+from text_utils import compact_json, estimate_tokens, split_windows, tokenize
+from timing import stage
+
+MAX_PASSAGE_TOKENS = 200
+DEFAULT_TOP_K = 5
+
+
+def _json_passages(obj, prefix=""):
+    """Eén passage per entry; te grote containers worden verder opgesplitst."""
+    if isinstance(obj, dict):
+        items = [(f"{prefix}{k}", v) for k, v in obj.items()]
+    elif isinstance(obj, list):
+        items = [(prefix.rstrip(" >"), v) for v in obj]
+    else:
+        return [str(obj)]
+
+    passages = []
+    for label, value in items:
+        text = compact_json(value)
+        if isinstance(value, (dict, list)) and value and estimate_tokens(text) > MAX_PASSAGE_TOKENS:
+            passages.extend(_json_passages(value, f"{label} > " if label else ""))
+        else:
+            passages.append(f"{label}: {text}" if label else text)
+    return passages
+
+
+def _text_passages(text):
+    """Alinea's (lege regel als scheiding); lange alinea's worden geknipt."""
+    passages = []
+    for block in text.replace("\r\n", "\n").split("\n\n"):
+        block = block.strip()
+        if block:
+            passages.extend(split_windows(block, MAX_PASSAGE_TOKENS))
+    return passages
+
+
+def split_passages(text, fmt="txt"):
+    """Passages uit een TXT- of (compact of ingesprongen) JSON-context."""
+    if fmt == "json":
+        try:
+            return _json_passages(json.loads(text))
+        except ValueError:
+            pass
+    return _text_passages(text)
+
+
+class ContextIndex:
+    """
+    BM25 over passages.
+
+    De postings staan per term aaneengesloten in NumPy-arrays (CSC-achtig),
+    zodat een zoekvraag neerkomt op één `bincount` over de postings van de
+    zoektermen.
+    """
+
+    def __init__(self, passages, k1=1.5, b=0.75):
+        self.passages = passages
+        self.passage_tokens = np.array([estimate_tokens(p) for p in passages], dtype=np.int64)
+        self.vocab = {}
+        docs, terms, tfs = [], [], []
+        lengths = np.zeros(len(passages), dtype=np.float64)
+        for i, passage in enumerate(passages):
+            words = tokenize(passage)
+            lengths[i] = len(words)
+            for term, tf in Counter(words).items():
+                docs.append(i)
+                terms.append(self.vocab.setdefault(term, len(self.vocab)))
+                tfs.append(tf)
+
+        terms = np.array(terms, dtype=np.int64)
+        order = np.argsort(terms, kind="stable")
+        self._docs = np.array(docs, dtype=np.int64)[order]
+        tf = np.array(tfs, dtype=np.float64)[order]
+        self._ptr = np.searchsorted(terms[order], np.arange(len(self.vocab) + 1))
+
+        n = len(passages)
+        df = np.diff(self._ptr)
+        idf = np.log1p((n - df + 0.5) / (df + 0.5))
+        avgdl = lengths.mean() if n and lengths.mean() > 0 else 1.0
+        norm = k1 * (1 - b + b * lengths[self._docs] / avgdl)
+        self._weights = np.repeat(idf, df) * tf * (k1 + 1) / (tf + norm)
+
+    @property
+    def total_tokens(self):
+        return int(self.passage_tokens.sum())
+
+    def scores(self, query):
+        """BM25-score per passage voor `query`."""
+        ids = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+        if not ids:
+            return np.zeros(len(self.passages))
+        postings = np.concatenate([np.arange(self._ptr[t], self._ptr[t + 1]) for t in ids])
+        return np.bincount(
+            self._docs[postings], weights=self._weights[postings], minlength=len(self.passages)
+        )
+
+    def top_k(self, query, k=DEFAULT_TOP_K):
+        """Indices van de k beste passages (score > 0), beste eerst."""
+        scores = self.scores(query)
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [int(i) for i in best if scores[i] > 0]
+
+    def select(self, query, k=DEFAULT_TOP_K, max_tokens=None):
+        """
+        Context-tekst voor `query`: de top-k passages binnen `max_tokens`,
+        in de oorspronkelijke volgorde. Kleine contexten (hoogstens k
+        passages) gaan in hun geheel mee.
+        """
+        if len(self.passages) <= k:
+            chosen = list(range(len(self.passages)))
+        else:
+            chosen = self.top_k(query, k)
+        picked, used = [], 0
+        for i in chosen:
+            if max_tokens is not None and used + self.passage_tokens[i] > max_tokens:
+                continue
+            picked.append(i)
+            used += int(self.passage_tokens[i])
+        return "\n".join(self.passages[i] for i in sorted(picked))
+
+
+_CACHE = OrderedDict()
+_CACHE_SIZE = 8
+_LOCK = threading.Lock()
+
+
+def get_index(text, fmt="txt"):
+    """ContextIndex voor `text`, per (hash, formaat) gecachet over alle sessies."""
+    key = (hashlib.sha256(text.encode("utf-8")).hexdigest(), fmt)
+    with _LOCK:
+        if key in _CACHE:
+            _CACHE.move_to_end(key)
+            return _CACHE[key]
+    with stage("context_index", fmt=fmt) as log:
+        index = ContextIndex(split_passages(text, fmt))
+        log["passages"] = len(index.passages)
+    with _LOCK:
+        _CACHE[key] = index
+        while len(_CACHE) > _CACHE_SIZE:
+            _CACHE.popitem(last=False)
+    return index
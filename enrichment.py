@@ -0,0 +1,414 @@
+"""
+Verrijking van transcripties met extra context via de Groq chat-API.
+
+De completion wordt gestreamd, zodat de UI tokens kan tonen zodra ze
+binnenkomen. Per request worden time-to-first-token en tokens/sec
+bijgehouden.
+
+Transcripties die niet in één call passen gaan via map-reduce: vensters
+binnen het tokenbudget worden parallel verrijkt; daarna herschrijft een
+reduce-call iedere naad (het einde van deel i plus het begin van deel i+1)
+tot een vloeiende overgang. Het eerste venster en de naden worden
+gestreamd. Met een ContextIndex krijgt ieder venster alleen de passages
+uit de context die erbij relevant zijn.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from context_index import DEFAULT_TOP_K
+from text_utils import CHARS_PER_TOKEN, estimate_tokens, split_windows
+from timing import emit
+
+DEFAULT_MODEL = "llama-3.1-8b-instant"
+DEFAULT_TOKEN_BUDGET = 6000  # invoer + uitvoer per call
+
+SYSTEM_PROMPT = (
+    "Combineer het transcript met de extra context. "
+    "Maak er één vloeiende, verbeterde transcriptie van in het Nederlands."
+)
+
+MAP_PROMPT = (
+    "Je krijgt één deel van een langer transcript plus extra context. "
+    "Verbeter alleen dit deel met behulp van de context, in het Nederlands. "
+    "Geef uitsluitend de verbeterde tekst van dit deel terug."
+)
+
+SEAM_PROMPT = (
+    "Je krijgt het einde van een deel en het begin van het volgende deel van "
+    "één al verbeterd transcript. Voeg ze samen tot één vloeiende, doorlopende "
+    "tekst in het Nederlands. Haal herhalingen op de overgang weg, maar "
+    "verander de inhoud niet. Geef uitsluitend de samengevoegde tekst terug."
+)
+
+DEFAULT_SEAM_TOKENS = 250  # per kant van een naad
+
+
+def build_messages(transcript, context_text):
+    """Chat-berichten voor één verrijkings-call."""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": (
+            f"Transcript:\n{transcript}\n\nContext:\n{context_text}\n\n"
+            "Geef de gecombineerde versie als doorlopende tekst."
+        )},
+    ]
+
+
+@dataclass
+class StreamStats:
+    ttft_s: float = None  # time-to-first-token
+    total_s: float = None
+    tokens: int = 0
+    context_tokens: int = 0  # gemiddeld meegestuurd per call
+    context_available: int = 0
+
+    @property
+    def tokens_per_s(self):
+        """Generatiesnelheid vanaf het eerste token."""
+        if not self.tokens or self.total_s is None or self.ttft_s is None:
+            return None
+        elapsed = self.total_s - self.ttft_s
+        return self.tokens / elapsed if elapsed > 0 else None
+
+
+def _completion_tokens(chunk):
+    """Tokens volgens de API (Groq stuurt usage mee in het laatste chunk)."""
+    usage = getattr(getattr(chunk, "x_groq", None), "usage", None) or getattr(chunk, "usage", None)
+    return getattr(usage, "completion_tokens", None)
+
+
+class EnrichmentStream:
+    """
+    Itereerbare stream van tekst-delta's.
+
+    Na afloop staan de volledige tekst in `text` en de metingen in `stats`.
+    `client` is alles met `client.chat.completions.create(..., stream=True)`,
+    dus ook een lokale stub die chunks yield. Na afloop volgt een
+    timing-record onder `stage_name` (niet bij `stage_name=None`).
+    """
+
+    def __init__(self, client, messages, model=DEFAULT_MODEL, temperature=0.3, stage_name="enrich"):
+        self.client = client
+        self.messages = messages
+        self.model = model
+        self.temperature = temperature
+        self.stage_name = stage_name
+        self.text = ""
+        self.stats = StreamStats()
+
+    def __iter__(self):
+        started = time.perf_counter()
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            temperature=self.temperature,
+            messages=self.messages,
+            stream=True
+        )
+        parts = []
+        counted = reported = 0
+        for chunk in stream:
+            reported = _completion_tokens(chunk) or reported
+            choices = getattr(chunk, "choices", None) or []
+            delta = getattr(choices[0].delta, "content", None) if choices else None
+            if not delta:
+                continue
+            if self.stats.ttft_s is None:
+                self.stats.ttft_s = time.perf_counter() - started
+            counted += 1
+            parts.append(delta)
+            yield delta
+        self.stats.total_s = time.perf_counter() - started
+        self.stats.tokens = reported or counted
+        self.text = "".join(parts)
+        if self.stage_name:
+            emit(
+                self.stage_name, self.stats.total_s, model=self.model,
+                ttft_ms=round(self.stats.ttft_s * 1000, 2) if self.stats.ttft_s is not None else None,
+                tokens=self.stats.tokens,
+            )
+
+
+def _complete(client, messages, model, temperature):
+    """Niet-gestreamde call; geeft alleen de tekst terug."""
+    res = client.chat.completions.create(
+        model=model,
+        temperature=temperature,
+        messages=messages
+    )
+    return res.choices[0].message.content
+
+
+def _map_messages(window, context_text, index, total):
+    return [
+        {"role": "system", "content": MAP_PROMPT},
+        {"role": "user", "content": (
+            f"Deel {index} van {total}:\n{window}\n\nContext:\n{context_text}"
+        )},
+    ]
+
+
+def _seam_messages(tail, head):
+    return [
+        {"role": "system", "content": SEAM_PROMPT},
+        {"role": "user", "content": f"Einde van het ene deel:\n{tail}\n\nBegin van het volgende deel:\n{head}"},
+    ]
+
+
+def _space_before(text, pos):
+    """Positie van de laatste spatie/regelovergang vóór `pos`, of 0."""
+    return max(text.rfind(" ", 0, max(pos, 0)), text.rfind("\n", 0, max(pos, 0)), 0)
+
+
+def _space_after(text, pos):
+    """Positie van de eerste spatie/regelovergang vanaf `pos`, of het einde."""
+    found = [i for i in (text.find(" ", pos), text.find("\n", pos)) if i >= 0]
+    return min(found) if found else len(text)
+
+
+def split_part(text, head_chars, tail_chars):
+    """
+    (kop, midden, staart) van een verrijkt deel, geknipt op woordgrenzen.
+    Kop en staart (ongeveer `head_chars`/`tail_chars` tekens) gaan naar de
+    naden met de buurdelen; een kort deel gaat helemaal in de kop op.
+    """
+    head = _space_after(text, head_chars) if head_chars else 0
+    tail = max(head, _space_before(text, len(text) - tail_chars)) if tail_chars else len(text)
+    return text[:head], text[head:tail], text[tail:]
+
+
+_END = object()
+
+
+def _drain(make_stream, out):
+    """Zet de delta's van een stream in queue `out` (voor ordelijk doorgeven)."""
+    try:
+        stream = make_stream()
+        for delta in stream:
+            out.put(delta)
+        return stream.text
+    except BaseException as exc:
+        out.put(exc)
+        raise
+    finally:
+        out.put(_END)
+
+
+def _drained(out):
+    while True:
+        item = out.get()
+        if item is _END:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+
+class MapReduceEnricher:
+    """
+    Verrijkt transcripties binnen een vast tokenbudget per call.
+
+    Van ieder budget gaat de helft naar invoer en de helft naar uitvoer,
+    omdat de verbeterde tekst ongeveer even lang is als het origineel.
+    """
+
+    def __init__(
+        self,
+        client,
+        model=DEFAULT_MODEL,
+        token_budget=DEFAULT_TOKEN_BUDGET,
+        max_workers=4,
+        temperature=0.3,
+        context_index=None,
+        top_k=DEFAULT_TOP_K,
+        seam_tokens=DEFAULT_SEAM_TOKENS,
+    ):
+        self.client = client
+        self.model = model
+        self.token_budget = token_budget
+        self.max_workers = max_workers
+        self.temperature = temperature
+        self.context_index = context_index
+        self.top_k = top_k
+        self.seam_tokens = seam_tokens
+
+    @property
+    def input_tokens(self):
+        return self.token_budget // 2
+
+    @property
+    def context_limit(self):
+        """Maximaal de helft van de invoerruimte gaat naar context."""
+        return self.input_tokens // 2
+
+    def _context_fit(self, context_text):
+        """Kapt de volledige context af op `context_limit`."""
+        if estimate_tokens(context_text) <= self.context_limit:
+            return context_text
+        return split_windows(context_text, self.context_limit)[0]
+
+    @property
+    def seam_chars(self):
+        """Omvang van iedere kant van een naad, zodat de reduce-call in het budget past."""
+        room = (self.input_tokens - estimate_tokens(SEAM_PROMPT) - 32) // 2
+        return int(max(32, min(self.seam_tokens, room)) * CHARS_PER_TOKEN)
+
+    def windows(self, transcript, context_tokens):
+        """Transcript-vensters die samen met prompt en context in het budget passen."""
+        overhead = estimate_tokens(MAP_PROMPT) + context_tokens + 32
+        return split_windows(transcript, max(self.input_tokens - overhead, 128)) or [transcript]
+
+    def stream(self, transcript, context_text, progress=None):
+        """
+        Geeft een stream van de verrijkte tekst.
+        Past alles in één call, dan is dat een gewone EnrichmentStream;
+        anders een MapReduceStream die bij het itereren de vensters en
+        naden verwerkt en na iedere call `progress(fractie)` meldt.
+        """
+        if self.context_index is not None:
+            available = self.context_index.total_tokens
+            windows = self.windows(transcript, self.context_limit)
+            contexts = [
+                self.context_index.select(w, self.top_k, self.context_limit)
+                for w in windows
+            ]
+        else:
+            available = estimate_tokens(context_text)
+            context_text = self._context_fit(context_text)
+            windows = self.windows(transcript, estimate_tokens(context_text))
+            contexts = [context_text] * len(windows)
+
+        if len(windows) == 1:
+            stream = EnrichmentStream(
+                self.client, build_messages(transcript, contexts[0]),
+                model=self.model, temperature=self.temperature,
+            )
+        else:
+            stream = MapReduceStream(self, windows, contexts, progress)
+        stream.stats.context_available = available
+        stream.stats.context_tokens = round(
+            sum(estimate_tokens(c) for c in contexts) / len(contexts)
+        )
+        return stream
+
+
+class MapReduceStream:
+    """
+    Stream over de map-reduce-pijplijn; zelfde interface als EnrichmentStream.
+
+    Alle vensters gaan parallel naar de API; het eerste wordt gestreamd
+    (minus zijn staart). Iedere naad wordt herschreven zodra beide buurdelen
+    klaar zijn, ook parallel, en in volgorde doorgestreamd, met daartussen
+    het midden van ieder deel.
+    """
+
+    def __init__(self, enricher, windows, contexts, progress=None):
+        self.enricher = enricher
+        self.windows = windows
+        self.contexts = contexts
+        self.progress = progress
+        self.text = ""
+        self.stats = StreamStats()
+        self.calls = 0
+        self._done = 0
+        self._lock = threading.Lock()
+
+    def _call_done(self, _future):
+        """Meldt na iedere afgeronde call `progress(fractie)`, onder de lock zodat hij niet terugloopt."""
+        with self._lock:
+            self._done += 1
+            if self.progress:
+                self.progress(self._done / (2 * len(self.windows) - 1))
+
+    def _stream(self, messages, stage_name):
+        e = self.enricher
+        return EnrichmentStream(
+            e.client, messages, model=e.model, temperature=e.temperature, stage_name=stage_name
+        )
+
+    def _seam(self, left, right, head_chars, tail_chars):
+        """Stream van de herschreven overgang tussen twee verrijkte delen."""
+        tail = split_part(left.result(), head_chars, tail_chars)[2]
+        head = split_part(right.result(), tail_chars, 0)[0]
+        return self._stream(_seam_messages(tail.strip(), head.strip()), "enrich_reduce")
+
+    def __iter__(self):
+        e = self.enricher
+        started = time.perf_counter()
+        total = len(self.windows)
+        edge = e.seam_chars
+        workers = max(1, min(e.max_workers, total))
+        maps = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s2t-map")
+        seams = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s2t-seam")
+        finished = []
+        try:
+            messages = [
+                _map_messages(w, c, i, total)
+                for i, (w, c) in enumerate(zip(self.windows, self.contexts), 1)
+            ]
+            first = queue.Queue()
+            parts = [maps.submit(_drain, lambda: self._stream(messages[0], None), first)]
+            parts += [
+                maps.submit(_complete, e.client, m, e.model, e.temperature)
+                for m in messages[1:]
+            ]
+            for part in parts:
+                part.add_done_callback(lambda _: finished.append(time.perf_counter()))
+                part.add_done_callback(self._call_done)
+            joins = []
+            for i in range(total - 1):
+                out = queue.Queue()
+                seams.submit(
+                    _drain, lambda i=i: self._seam(parts[i], parts[i + 1], edge if i else 0, edge), out
+                ).add_done_callback(self._call_done)
+                joins.append(out)
+            self.calls += 2 * total - 1
+
+            pieces = []
+
+            def write(text):
+                if text:
+                    if self.stats.ttft_s is None:
+                        self.stats.ttft_s = time.perf_counter() - started
+                    pieces.append(text)
+                return text
+
+            # eerste venster live doorgeven; de staart wacht op de naad
+            sent, buf = 0, ""
+            for delta in _drained(first):
+                buf += delta
+                cut = _space_before(buf, len(buf) - edge)
+                if cut > sent:
+                    yield write(buf[sent:cut])
+                    sent = cut
+            body = split_part(parts[0].result(), 0, edge)[1]
+            if write(body[sent:]):
+                yield body[sent:]
+
+            for i, out in enumerate(joins, 1):
+                lead = " " if pieces else ""
+                for delta in _drained(out):
+                    if lead is not None:
+                        delta = lead + delta.lstrip()
+                        if delta == lead:
+                            continue
+                        lead = None
+                    yield write(delta)
+                middle = split_part(parts[i].result(), edge, edge if i < total - 1 else 0)[1].strip()
+                if middle:
+                    yield write((" " if pieces else "") + middle)
+        finally:
+            maps.shutdown(wait=False, cancel_futures=True)
+            seams.shutdown(wait=False, cancel_futures=True)
+
+        self.stats.total_s = time.perf_counter() - started
+        self.text = "".join(pieces)
+        self.stats.tokens = estimate_tokens(self.text)
+        emit("enrich_map", max(finished) - started, windows=total)
+        emit(
+            "enrich", self.stats.total_s, model=e.model,
+            ttft_ms=round(self.stats.ttft_s * 1000, 2) if self.stats.ttft_s is not None else None,
+            tokens=self.stats.tokens, windows=total, calls=self.calls,
+        )
@@ -0,0 +1,117 @@
+"""
+Achtergrond-jobs voor trage Groq-calls.
+
+Eén scheduler per proces, gedeeld door alle Streamlit-sessies. Jobs krijgen
+een ID dat de UI kan pollen. Identieke jobs die nog lopen (zelfde sleutel)
+worden samengevoegd tot één uitvoering (single-flight).
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    key: str
+    status: str = QUEUED
+    progress: float = 0.0
+    message: str = ""
+    chunks: list = field(default_factory=list)  # tussentijdse tekst, bijv. een lopende stream
+    result: object = None
+    error: str = None
+    created: float = field(default_factory=time.time)
+    finished: float = None
+
+    @property
+    def done(self):
+        return self.status in (DONE, FAILED)
+
+    @property
+    def partial(self):
+        """Tussentijdse tekst; pas bij het opvragen samengevoegd."""
+        return "".join(self.chunks)
+
+    def append(self, text):
+        """Voegt een stuk tussentijdse tekst toe (O(1), ook voor lange streams)."""
+        self.chunks.append(text)
+
+    def update(self, progress=None, message=None):
+        """Voortgang bijwerken vanuit de job zelf."""
+        if progress is not None:
+            self.progress = min(1.0, max(0.0, progress))
+        if message is not None:
+            self.message = message
+
+
+class JobScheduler:
+    """
+    Thread-pool met een maximum aan gelijktijdige jobs.
+
+    `fn(job, *args, **kwargs)` krijgt de Job mee om voortgang te melden;
+    de returnwaarde komt in `job.result`. Afgeronde jobs blijven `keep_s`
+    seconden opvraagbaar, mislukte maar `keep_failed_s`: daarna start een
+    nieuwe `submit` met dezelfde sleutel een verse poging.
+    """
+
+    def __init__(self, max_workers=4, keep_s=3600, keep_failed_s=30):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s2t-job")
+        self._jobs = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.keep_s = keep_s
+        self.keep_failed_s = keep_failed_s
+
+    def submit(self, key, fn, *args, **kwargs):
+        """Start een job en geeft het ID; loopt er al een met `key`, dan diens ID."""
+        with self._lock:
+            self._prune()
+            if key in self._inflight:
+                return self._inflight[key]
+            job = Job(id=uuid.uuid4().hex, key=key)
+            self._jobs[job.id] = job
+            self._inflight[key] = job.id
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def get(self, job_id):
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def discard(self, job_id):
+        """Vergeet een afgeronde job (bijv. een mislukte, vóór een nieuwe poging)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.done:
+                del self._jobs[job_id]
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = RUNNING
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.progress = 1.0
+            job.status = DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished = time.time()
+            with self._lock:
+                self._inflight.pop(job.key, None)
+
+    def _prune(self):
+        now = time.time()
+        expired = [
+            j.id for j in self._jobs.values()
+            if j.finished and j.finished < now - (self.keep_failed_s if j.status == FAILED else self.keep_s)
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,130 @@
+"""
+Rate-limiting voor Groq-calls.
+
+Per endpoint een token bucket (requests per minuut), een globale limiet op
+het aantal gelijktijdige requests en retries met jitter bij een 429. Een
+`retry-after` van de API blokkeert de bucket voor alle aanvragers, zodat
+niet iedere worker zelf tegen de limiet aanloopt.
+"""
+import random
+import threading
+import time
+from functools import partial
+from types import SimpleNamespace
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per seconde, tot `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Wacht tot er een token is en neemt het."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def block(self, seconds):
+        """Houdt alle aanvragers minstens `seconds` tegen (bijv. na een 429)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+def _status_code(exc):
+    return getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+
+
+def is_rate_limited(exc):
+    return _status_code(exc) == 429
+
+
+def retry_after(exc):
+    """Wachttijd in seconden uit de `retry-after` header, of None."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return max(0.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Gedeelde limieten voor alle Groq-calls in het proces.
+    Standaardwaarden volgen de gratis Groq-tier (20 rpm Whisper, 30 rpm chat).
+    """
+
+    def __init__(
+        self,
+        audio_rpm=20,
+        chat_rpm=30,
+        max_concurrent=8,
+        max_retries=5,
+        backoff_s=1.0,
+        max_backoff_s=60.0,
+    ):
+        self.buckets = {
+            "audio": TokenBucket(audio_rpm / 60, capacity=max(1.0, audio_rpm / 4)),
+            "chat": TokenBucket(chat_rpm / 60, capacity=max(1.0, chat_rpm / 4)),
+        }
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.throttled = 0  # aantal ontvangen 429's
+        self._throttled_lock = threading.Lock()
+
+    def call(self, kind, fn, *args, **kwargs):
+        """Roept `fn` aan binnen de limieten van endpoint `kind`."""
+        bucket = self.buckets[kind]
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire()
+            with self._slots:
+                try:
+                    return fn(*args, **kwargs)
+                except Exception as e:
+                    if not is_rate_limited(e) or attempt == self.max_retries:
+                        raise
+                    with self._throttled_lock:
+                        self.throttled += 1
+                    backoff = min(self.max_backoff_s, self.backoff_s * 2 ** attempt)
+                    wait = retry_after(e)
+                    # retry-after respecteren, met jitter zodat workers niet tegelijk terugkomen
+                    wait = (wait if wait is not None else 0.0) + random.uniform(0, backoff)
+            bucket.block(wait)
+
+
+class RateLimitedClient:
+    """
+    Groq-client met dezelfde interface voor de gebruikte endpoints,
+    maar met iedere call via de RateLimiter. De eigen retries van de SDK
+    gaan uit, anders wordt een 429 buiten de bucket om opnieuw geprobeerd.
+    """
+
+    def __init__(self, client, limiter):
+        if hasattr(client, "with_options"):
+            client = client.with_options(max_retries=0)
+        self.client = client
+        self.limiter = limiter
+        self.models = client.models
+        self.audio = SimpleNamespace(transcriptions=SimpleNamespace(
+            create=partial(limiter.call, "audio", client.audio.transcriptions.create)
+        ))
+        self.chat = SimpleNamespace(completions=SimpleNamespace(
+            create=partial(limiter.call, "chat", client.chat.completions.create)
+        ))
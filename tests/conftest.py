@@ -0,0 +1,5 @@
+import os
+import sys
+
+# modules staan plat in de root van de repo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
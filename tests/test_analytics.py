@@ -0,0 +1,68 @@
+"""Woordtelling, n-grammen en spreektempo tegen een Counter-referentie."""
+import random
+from collections import Counter
+
+import numpy as np
+
+from analytics import DUTCH_STOPWORDS, _encode, analyze, ngram_counts, words_per_minute
+from text_utils import tokenize
+
+
+def reference(words, n, stopwords):
+    grams = Counter(
+        tuple(words[i:i + n]) for i in range(len(words) - n + 1)
+        if not stopwords or (words[i] not in stopwords and words[i + n - 1] not in stopwords)
+    )
+    return grams
+
+
+def test_ngram_counts_match_counter():
+    rng = random.Random(3)
+    vocab = ["de", "het", "planning", "budget", "klant", "team", "en", "sprint", "risico"]
+    words = [rng.choice(vocab) for _ in range(5000)]
+    ids, names = _encode(words)
+    is_stop = np.array([w in DUTCH_STOPWORDS for w in names])
+    for n in (2, 3):
+        for stop in (None, is_stop):
+            got = {
+                tuple(names[i] for i in parts): count
+                for parts, count in ngram_counts(ids, n, len(names), stop, top_n=None)
+            }
+            assert got == dict(reference(words, n, DUTCH_STOPWORDS if stop is not None else None))
+
+
+def test_ngram_packing_survives_large_vocabularies():
+    # 3-grammen over 100k verschillende woorden: codes tot 1e15, nog binnen int64
+    ids = np.arange(100_000, dtype=np.int64)
+    ids = np.concatenate([ids, ids[:3]])
+    grams = ngram_counts(ids, 3, 100_000, top_n=1)
+    assert grams == [([0, 1, 2], 2)]
+
+
+def test_analyze_top_words_and_ties():
+    stats = analyze("Budget budget planning. Planning klant! De de de de.", top_n=3)
+    assert stats.word_count == 9
+    assert stats.unique_words == 4
+    assert stats.unigrams == [("budget", 2), ("planning", 2), ("klant", 1)]
+    assert stats.bigrams[0] == ("budget budget", 1)
+
+
+def test_dutch_contractions_and_curly_apostrophes():
+    text = "’s Avonds gaan we naar ’t huis, zo’n keer of wat. 's avonds weer naar 't huis."
+    assert tokenize(text)[:6] == ["'s", "avonds", "gaan", "we", "naar", "'t"]
+    assert "zo'n" in tokenize(text)
+    stats = analyze(text, top_n=5)
+    top = [w for w, _ in stats.unigrams]
+    assert "s" not in top and "t" not in top and "'s" not in top and "zo'n" not in top
+    assert top[:2] == ["avonds", "huis"]
+    assert ("avonds", 2) in stats.unigrams
+
+
+def test_words_per_minute_buckets_by_segment_start():
+    segments = [
+        {"start": 0.0, "end": 5.0, "text": "een twee drie"},
+        {"start": 59.0, "end": 61.0, "text": "vier"},
+        {"start": 130.0, "end": 131.0, "text": "vijf zes"},
+    ]
+    assert words_per_minute(segments) == [4, 0, 2]
+    assert words_per_minute([]) is None
@@ -0,0 +1,90 @@
+"""Decoderen, downmixen, resamplen en normaliseren, zonder netwerk."""
+import io
+import os
+import wave
+
+import numpy as np
+import pytest
+
+from audio import AudioClip, TARGET_RATE, decode_wav, normalize, resample, to_mono
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def tone(freq, rate=48000, seconds=1.0, amplitude=10000):
+    t = np.arange(int(rate * seconds)) / rate
+    return AudioClip((amplitude * np.sin(2 * np.pi * freq * t)).astype(np.int16).reshape(-1, 1), rate)
+
+
+def rms(clip):
+    # randen overslaan: daar loopt het filter in en uit
+    x = clip.samples[len(clip.samples) // 10:-len(clip.samples) // 10].astype(np.float64)
+    return np.sqrt((x ** 2).mean())
+
+
+def wav_bytes(raw, width, channels=1, rate=8000):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(width)
+        wf.setframerate(rate)
+        wf.writeframes(raw)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("name", ["sample.wav", "Uw opname 6.wav"])
+def test_bundled_recordings_normalize_to_16k_mono(name):
+    with open(os.path.join(ROOT, name), "rb") as f:
+        data = f.read()
+    original = decode_wav(data)
+    prep = normalize(data, fmt="wav")
+    assert prep.clip.rate == TARGET_RATE
+    assert prep.clip.channels == 1
+    assert abs(prep.clip.duration - original.duration) < 1 / TARGET_RATE + 1 / original.rate
+    assert decode_wav(prep.data).samples.shape == prep.clip.samples.shape
+
+
+def test_resampler_passes_speech_band_and_blocks_aliases():
+    assert rms(resample(tone(1000), TARGET_RATE)) / rms(tone(1000)) > 0.95
+    # 12 kHz ligt boven de Nyquist-frequentie van 16 kHz en moet weg
+    assert rms(resample(tone(12000), TARGET_RATE)) / rms(tone(12000)) < 0.05
+
+
+def test_blockwise_resampling_matches_single_block():
+    rng = np.random.default_rng(1)
+    clip = AudioClip((rng.standard_normal((44100 * 2, 2)) * 3000).astype(np.int16), 44100)
+    whole = resample(clip, TARGET_RATE, block=1 << 20)
+    assert np.array_equal(resample(clip, TARGET_RATE, block=1000).samples, whole.samples)
+    assert whole.frames == 2 * TARGET_RATE
+
+
+def test_upsampling_interpolates():
+    clip = AudioClip(np.array([[0], [100], [200], [300]], dtype=np.int16), 8000)
+    assert resample(clip, 16000).samples[:, 0].tolist() == [0, 50, 100, 150, 200, 250, 300, 300]
+
+
+def test_to_mono_averages_channels():
+    clip = AudioClip(np.array([[100, 300], [-100, -200], [5, 6]], dtype=np.int16), 8000)
+    assert to_mono(clip).samples[:, 0].tolist() == [200, -150, 6]
+    mono = tone(440)
+    assert to_mono(mono) is mono
+
+
+@pytest.mark.parametrize("width", [1, 2, 3, 4])
+def test_decode_wav_sample_widths(width):
+    values = np.array([-32768, -256, 0, 256, 32512], dtype=np.int16)
+    shift = 16 - 8 * width
+    if width == 1:
+        raw = ((values.astype(np.int32) >> 8) + 128).astype(np.uint8).tobytes()
+    elif width == 2:
+        raw = values.astype("<i2").tobytes()
+    else:
+        wide = values.astype(np.int64) << -shift
+        raw = b"".join(int(v).to_bytes(width, "little", signed=True) for v in wide)
+    clip = decode_wav(wav_bytes(raw, width))
+    assert clip.samples[:, 0].tolist() == values.tolist()
+
+
+def test_decode_wav_rejects_garbage():
+    with pytest.raises(ValueError):
+        decode_wav(b"RIFF....WAVEgeen geldige chunks")
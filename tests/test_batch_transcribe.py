@@ -0,0 +1,73 @@
+"""Hervatten via het manifest, met een fake client."""
+import json
+
+from batch_transcribe import load_manifest, repair_manifest, run_batch
+
+
+class FakeWhisper:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.names = []
+        self.audio = self
+        self.transcriptions = self
+
+    def create(self, model, file, response_format, **params):
+        name, _ = file
+        self.names.append(name)
+        if name in self.fail:
+            raise RuntimeError("kapot")
+        return {"text": f"tekst van {name}", "segments": [], "duration": 1.0}
+
+
+def make_files(tmp_path, *names):
+    for name in names:
+        (tmp_path / name).write_bytes(name.encode() * 10)  # geen echte audio: normalisatie valt terug
+
+
+def run(client, tmp_path, manifest):
+    return run_batch(client, str(tmp_path), str(manifest), workers=2, log=lambda msg: None)
+
+
+def test_resume_skips_files_in_manifest(tmp_path):
+    make_files(tmp_path, "a.wav", "b.mp3", "c.m4a")
+    manifest = tmp_path / "manifest.jsonl"
+
+    first = run(FakeWhisper(fail={"b.mp3"}), tmp_path, manifest)
+    assert (first["files"], first["failed"], first["skipped"]) == (2, 1, 0)
+
+    client = FakeWhisper()
+    second = run(client, tmp_path, manifest)
+    assert client.names == ["b.mp3"]
+    assert (second["files"], second["failed"], second["skipped"]) == (1, 0, 2)
+    records = [json.loads(line) for line in manifest.read_text(encoding="utf-8").splitlines()]
+    assert sorted(r["path"] for r in records) == ["a.wav", "b.mp3", "c.m4a"]
+
+
+def test_truncated_last_line_is_repaired(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    good = json.dumps({"path": "a.wav", "model": "m"}) + "\n"
+    manifest.write_text(good + '{"path": "b.wa', encoding="utf-8")
+    repair_manifest(str(manifest))
+    assert manifest.read_text(encoding="utf-8") == good
+
+
+def test_foreign_records_are_ignored(tmp_path):
+    manifest = tmp_path / "requests.jsonl"
+    manifest.write_text(
+        '{"request_id": "x", "title": "geen manifest"}\n'
+        '[1, 2]\n'
+        'geen json\n'
+        '{"path": "a.wav", "model": "m"}\n',
+        encoding="utf-8",
+    )
+    assert load_manifest(str(manifest)) == {("a.wav", "m")}
+    assert load_manifest(str(tmp_path / "ontbreekt.jsonl")) == set()
+
+
+def test_duration_comes_from_api_without_local_decoder(tmp_path):
+    make_files(tmp_path, "opname.mp3")  # niet lokaal te decoderen
+    manifest = tmp_path / "manifest.jsonl"
+    summary = run(FakeWhisper(), tmp_path, manifest)
+    record = json.loads(manifest.read_text(encoding="utf-8"))
+    assert record["duration"] == 1.0
+    assert summary["audio_s_per_s"] > 0
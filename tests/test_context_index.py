@@ -0,0 +1,86 @@
+"""BM25-index over een vaste woordenlijst."""
+import json
+import math
+from collections import Counter
+
+import pytest
+
+from context_index import MAX_PASSAGE_TOKENS, ContextIndex, get_index, split_passages
+from text_utils import estimate_tokens, tokenize
+
+GLOSSARY = {
+    "Kwartaalplanning": "Overzicht van de planning per kwartaal, opgesteld door het projectteam.",
+    "Budget": "Het budget voor het project wordt per kwartaal herzien.",
+    "Klantenpanel": "Groep klanten die feedback geeft op nieuwe functies.",
+    "Risicoregister": "Lijst met risico's, eigenaar en maatregel per risico.",
+    "Sprint": "Periode van twee weken waarin het team werk oppakt.",
+    "Retrospectief": "Terugblik van het team na iedere sprint.",
+}
+
+
+def bm25_reference(passages, query, k1=1.5, b=0.75):
+    docs = [Counter(tokenize(p)) for p in passages]
+    lengths = [sum(d.values()) for d in docs]
+    avgdl = sum(lengths) / len(docs)
+    scores = []
+    for doc, length in zip(docs, lengths):
+        score = 0.0
+        for term in set(tokenize(query)):
+            df = sum(term in d for d in docs)
+            if not df:
+                continue
+            idf = math.log1p((len(docs) - df + 0.5) / (df + 0.5))
+            tf = doc[term]
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avgdl))
+        scores.append(score)
+    return scores
+
+
+def test_scores_match_reference_bm25():
+    passages = split_passages(json.dumps(GLOSSARY), "json")
+    index = ContextIndex(passages)
+    for query in ("budget per kwartaal", "team sprint", "onbekend woord"):
+        assert index.scores(query).tolist() == pytest.approx(bm25_reference(passages, query))
+
+
+def test_top_k_ranks_relevant_passages_first():
+    index = ContextIndex(split_passages(json.dumps(GLOSSARY), "json"))
+    best = index.top_k("het budget van dit kwartaal", k=2)
+    assert [index.passages[i].split(":")[0] for i in best] == ["Budget", "Kwartaalplanning"]
+    assert index.top_k("niets relevants", k=3) == []
+
+
+def test_select_respects_token_cap_and_original_order():
+    index = ContextIndex(split_passages(json.dumps(GLOSSARY), "json"))
+    text = index.select("team sprint retrospectief", k=3)
+    lines = text.split("\n")
+    assert [line.split(":")[0] for line in lines] == ["Sprint", "Retrospectief"]
+
+    cap = estimate_tokens(lines[0])
+    capped = index.select("team sprint retrospectief", k=3, max_tokens=cap)
+    assert len(capped.split("\n")) == 1
+    assert estimate_tokens(capped) <= cap
+
+
+def test_small_context_goes_along_whole():
+    index = ContextIndex(["een", "twee"])
+    assert index.select("drie", k=5) == "een\ntwee"
+
+
+def test_oversized_json_containers_are_split():
+    big = {"Team": {f"lid{i}": "medewerker met een lange omschrijving " * 5 for i in range(20)}}
+    assert estimate_tokens(json.dumps(big)) > MAX_PASSAGE_TOKENS
+    passages = split_passages(json.dumps(big), "json")
+    assert len(passages) == 20
+    assert passages[0].startswith("Team > lid0: ")
+
+
+def test_text_context_splits_on_blank_lines():
+    assert split_passages("eerste alinea\n\n\r\ntweede alinea\n", "txt") == ["eerste alinea", "tweede alinea"]
+    assert split_passages("{geen json", "json") == ["{geen json"]
+
+
+def test_get_index_reuses_index_per_text_and_format():
+    text = json.dumps(GLOSSARY)
+    assert get_index(text, "json") is get_index(text, "json")
+    assert get_index(text, "txt") is not get_index(text, "json")
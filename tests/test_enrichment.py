@@ -0,0 +1,130 @@
+"""Streaming en map-reduce-verrijking met een stub-chatclient."""
+import time
+from types import SimpleNamespace
+
+from enrichment import (
+    MAP_PROMPT,
+    SEAM_PROMPT,
+    EnrichmentStream,
+    MapReduceEnricher,
+    MapReduceStream,
+    StreamStats,
+    split_part,
+)
+
+
+def chunk(content=None, usage=None):
+    delta = SimpleNamespace(content=content)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(delta=delta)],
+        x_groq=SimpleNamespace(usage=usage) if usage else None,
+    )
+
+
+class StubChat:
+    """Streamt vaste delta's met een vertraging vóór het eerste token."""
+
+    def __init__(self, deltas, first_delay=0.05, usage_tokens=None):
+        self.deltas = deltas
+        self.first_delay = first_delay
+        self.usage_tokens = usage_tokens
+        self.calls = []
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, model, temperature, messages, stream=False):
+        self.calls.append(messages)
+        return self._stream()
+
+    def _stream(self):
+        time.sleep(self.first_delay)
+        yield chunk("")  # rol-chunk zonder tekst telt niet als eerste token
+        for d in self.deltas:
+            yield chunk(d)
+        if self.usage_tokens is not None:
+            yield chunk(usage=SimpleNamespace(completion_tokens=self.usage_tokens))
+
+
+def test_stream_yields_deltas_and_measures_ttft():
+    client = StubChat(["Hallo", " wereld", "."], first_delay=0.05)
+    stream = EnrichmentStream(client, [{"role": "user", "content": "x"}])
+    assert list(stream) == ["Hallo", " wereld", "."]
+    assert stream.text == "Hallo wereld."
+    assert stream.stats.ttft_s >= 0.05
+    assert stream.stats.total_s >= stream.stats.ttft_s
+    assert stream.stats.tokens == 3  # geen usage: delta's tellen
+
+
+def test_stream_prefers_reported_usage():
+    client = StubChat(["a", "b"], first_delay=0.0, usage_tokens=7)
+    stream = EnrichmentStream(client, [])
+    list(stream)
+    assert stream.stats.tokens == 7
+
+
+def test_tokens_per_s_excludes_time_to_first_token():
+    stats = StreamStats(ttft_s=1.0, total_s=3.0, tokens=10)
+    assert stats.tokens_per_s == 5.0
+    assert StreamStats(ttft_s=None, total_s=1.0, tokens=3).tokens_per_s is None
+
+
+class EchoChat:
+    """
+    Map-calls geven hun venster terug (zo lang als de invoer, zoals bij echte
+    verrijking); naad-calls plakken einde en begin aan elkaar.
+    """
+
+    def __init__(self):
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, model, temperature, messages, stream=False):
+        system, user = messages[0]["content"], messages[1]["content"]
+        self.prompts.append(system)
+        if system == MAP_PROMPT:
+            text = user.split(":\n", 1)[1].rsplit("\n\nContext:", 1)[0]
+        else:
+            tail, head = user.split("\n\nBegin van het volgende deel:\n")
+            text = tail.split(":\n", 1)[1] + " " + head
+        if not stream:
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+        return iter([chunk(w if i == 0 else " " + w) for i, w in enumerate(text.split())])
+
+
+def transcript(words):
+    return " ".join(f"woord{i}" for i in range(words))
+
+
+def test_map_reduce_rewrites_every_seam_and_keeps_all_text():
+    for words in (3000, 8000, 22000):
+        client = EchoChat()
+        enricher = MapReduceEnricher(client, token_budget=6000)
+        text = transcript(words)
+        stream = enricher.stream(text, "")
+        assert isinstance(stream, MapReduceStream)
+        deltas = list(stream)
+
+        windows = client.prompts.count(MAP_PROMPT)
+        assert windows == len(stream.windows) > 1
+        assert client.prompts.count(SEAM_PROMPT) == windows - 1
+        assert stream.calls == 2 * windows - 1
+        # niets verloren of verdubbeld op de naden
+        assert stream.text.split() == text.split()
+        assert "".join(deltas) == stream.text
+        assert len(deltas) > windows  # gestreamd, niet per deel
+        assert stream.stats.ttft_s < stream.stats.total_s
+
+
+def test_split_part_cuts_on_word_boundaries():
+    text = "een twee drie vier vijf zes zeven acht"
+    head, middle, tail = split_part(text, 8, 10)
+    assert head + middle + tail == text
+    assert head == "een twee" and tail == " zeven acht"
+    assert split_part("kort", 8, 10) == ("kort", "", "")
+
+
+def test_map_reduce_reports_progress_per_call():
+    seen = []
+    stream = MapReduceEnricher(EchoChat(), token_budget=6000).stream(transcript(8000), "", progress=seen.append)
+    list(stream)
+    assert len(seen) == stream.calls
+    assert sorted(seen) == seen and seen[-1] == 1.0
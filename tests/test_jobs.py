@@ -0,0 +1,57 @@
+"""Single-flight en herkansing na een mislukte job."""
+import threading
+import time
+
+from jobs import DONE, FAILED, JobScheduler
+
+
+def wait(scheduler, job_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = scheduler.get(job_id)
+        if job is None or job.done:
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job liep niet af")
+
+
+def test_same_key_shares_running_job():
+    release = threading.Event()
+    scheduler = JobScheduler(max_workers=2)
+    first = scheduler.submit("k", lambda job: release.wait(5) and "klaar")
+    second = scheduler.submit("k", lambda job: "dubbel")
+    assert first == second
+    release.set()
+    assert wait(scheduler, first).result == "klaar"
+
+
+def test_failed_job_can_be_retried():
+    attempts = []
+
+    def flaky(job):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("429")
+        return "ok"
+
+    scheduler = JobScheduler(max_workers=1)
+    job_id = scheduler.submit("k", flaky)
+    assert wait(scheduler, job_id).status == FAILED
+
+    scheduler.discard(job_id)
+    assert scheduler.get(job_id) is None
+    retry = scheduler.submit("k", flaky)
+    assert retry != job_id
+    assert wait(scheduler, retry).status == DONE
+
+
+def test_failed_jobs_expire_before_successful_ones():
+    scheduler = JobScheduler(max_workers=1, keep_s=60, keep_failed_s=0)
+    ok = scheduler.submit("ok", lambda job: 1)
+    wait(scheduler, ok)
+    failed = scheduler.submit("fail", lambda job: 1 / 0)
+    deadline = time.time() + 5
+    while scheduler.get(failed) is not None and time.time() < deadline:
+        time.sleep(0.01)
+    assert scheduler.get(failed) is None
+    assert scheduler.get(ok).status == DONE
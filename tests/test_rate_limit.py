@@ -0,0 +1,59 @@
+"""Retries bij 429's lopen alleen via de RateLimiter."""
+from types import SimpleNamespace
+
+import pytest
+
+from rate_limit import RateLimitedClient, RateLimiter
+
+
+class RateLimited(Exception):
+    status_code = 429
+    response = SimpleNamespace(status_code=429, headers={"retry-after": "0"})
+
+
+class StubSDK:
+    """Neemt `max_retries` over zoals de Groq-client; iedere call geeft een 429."""
+
+    def __init__(self, max_retries=2):
+        self.max_retries = max_retries
+        self.requests = 0
+        self.models = None
+        self.audio = SimpleNamespace(transcriptions=SimpleNamespace(create=self.create))
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def with_options(self, max_retries):
+        clone = StubSDK(max_retries)
+        clone.requests = self.requests
+        return clone
+
+    def create(self, **kwargs):
+        for _ in range(self.max_retries + 1):
+            self.requests += 1
+        raise RateLimited()
+
+
+def test_sdk_retries_are_disabled():
+    limiter = RateLimiter(chat_rpm=6000, max_retries=2, backoff_s=0.001)
+    client = RateLimitedClient(StubSDK(), limiter)
+    assert client.client.max_retries == 0
+    with pytest.raises(RateLimited):
+        client.chat.completions.create(model="m", messages=[])
+    assert client.client.requests == 3  # 1 poging + 2 retries van de limiter
+    assert limiter.throttled == 2
+
+
+def test_throttled_counter_is_exact_under_concurrency():
+    from concurrent.futures import ThreadPoolExecutor
+
+    limiter = RateLimiter(audio_rpm=600000, max_concurrent=16, max_retries=1, backoff_s=0.0)
+
+    def once_limited(state):
+        if not state:
+            state.append(1)
+            raise RateLimited()
+        return "ok"
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda _: limiter.call("audio", once_limited, []), range(400)))
+    assert results == ["ok"] * 400
+    assert limiter.throttled == 400
@@ -0,0 +1,55 @@
+"""Sleutels, tellers en LRU-eviction van de transcriptie-cache."""
+import itertools
+import json
+
+import transcript_cache
+from transcript_cache import TranscriptCache, make_key
+
+
+def entry(n):
+    return {"text": f"transcript {n}", "segments": []}
+
+
+def size(value):
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+def test_key_depends_on_audio_model_and_params():
+    key = make_key(b"audio", "whisper-large-v3", {"language": "nl"})
+    assert key == make_key(b"audio", "whisper-large-v3", {"language": "nl"})
+    assert key != make_key(b"andere audio", "whisper-large-v3", {"language": "nl"})
+    assert key != make_key(b"audio", "whisper-large-v3-turbo", {"language": "nl"})
+    assert key != make_key(b"audio", "whisper-large-v3", {"language": "en"})
+    assert make_key(b"a", "m", {"x": 1, "y": 2}) == make_key(b"a", "m", {"y": 2, "x": 1})
+
+
+def test_hits_and_misses_are_counted(tmp_path):
+    cache = TranscriptCache(str(tmp_path / "cache.sqlite3"))
+    assert cache.get("k") is None
+    cache.put("k", entry(1))
+    assert cache.get("k") == entry(1)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["bytes"] == size(entry(1))
+
+
+def test_eviction_removes_least_recently_accessed(tmp_path, monkeypatch):
+    clock = itertools.count(1000)
+    monkeypatch.setattr(transcript_cache.time, "time", lambda: next(clock))
+    cache = TranscriptCache(str(tmp_path / "cache.sqlite3"), max_bytes=3 * size(entry(1)))
+    for n in (1, 2, 3):
+        cache.put(f"k{n}", entry(n))
+    cache.get("k1")  # k1 is nu recenter gebruikt dan k2
+    cache.put("k4", entry(4))
+
+    assert cache.get("k2") is None
+    assert all(cache.get(f"k{n}") == entry(n) for n in (1, 3, 4))
+    assert cache.stats()["evictions"] == 1
+
+
+def test_second_instance_shares_entries(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    TranscriptCache(path).put("k", entry(1))
+    other = TranscriptCache(path)
+    assert other.get("k") == entry(1)
+    assert other.stats()["hits"] == 1
@@ -0,0 +1,90 @@
+"""Splitsen, tijdstempels en ontdubbelen met een fake Whisper-client."""
+import threading
+
+import numpy as np
+
+from audio import AudioClip, decode_wav, encode_wav
+from transcription import TranscriptionEngine, _strip_overlap
+
+RATE = 1000  # 1 kHz houdt de clips klein; de engine rekent in frames
+
+
+class FakeWhisper:
+    """
+    Geeft per absolute seconde één segment "woord<s>". Iedere sample bevat
+    zijn eigen framenummer, zodat de fake weet waar in de opname een stuk begint.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+        self.audio = self
+        self.transcriptions = self
+
+    def create(self, model, file, response_format, **params):
+        name, payload = file
+        clip = decode_wav(payload)
+        start = int(clip.samples[0, 0]) / RATE
+        end = start + clip.duration
+        with self._lock:
+            self.calls.append((name, start, end))
+        segments = []
+        for s in range(int(start), int(np.ceil(end))):
+            segments.append({
+                "start": max(s, start) - start,
+                "end": min(s + 1, end) - start,
+                "text": f" woord{s}",
+            })
+        return {"text": "", "segments": segments, "duration": clip.duration}
+
+
+def ramp_wav(seconds):
+    frames = np.arange(seconds * RATE, dtype=np.int16).reshape(-1, 1)
+    return encode_wav(AudioClip(frames, RATE))
+
+
+def test_strip_overlap_removes_repeated_words():
+    assert _strip_overlap("dit is het einde van", "Einde van, het nieuwe stuk") == "het nieuwe stuk"
+    assert _strip_overlap("geen overlap hier", "  iets anders ") == "iets anders"
+    assert _strip_overlap("alles dubbel", "alles dubbel") == ""
+
+
+def test_single_request_when_under_limit():
+    client = FakeWhisper()
+    engine = TranscriptionEngine(client, normalize=False)
+    result = engine.transcribe("kort.wav", ramp_wav(3))
+    assert len(client.calls) == 1
+    assert result.text == "woord0 woord1 woord2"
+
+
+def test_chunks_are_stitched_in_order_without_duplicates():
+    client = FakeWhisper()
+    progress = []
+    # hoogstens 4 s per stuk (inclusief 1 s overlap)
+    engine = TranscriptionEngine(client, max_chunk_bytes=2 * 4000 + 44, normalize=False, max_workers=3)
+    result = engine.transcribe("lang.wav", ramp_wav(10), progress=progress.append)
+
+    assert len(client.calls) > 2
+    assert all(end - start <= 4.0 for _, start, end in client.calls)
+    assert result.upload["sent_bytes"] > len(ramp_wav(10))  # overlap wordt dubbel verstuurd
+    assert sorted(progress) == progress and progress[-1] == 1.0
+    assert result.text == " ".join(f"woord{s}" for s in range(10))
+    # tijdstempels zijn terugvertaald naar de positie in de hele opname
+    for seg in result.segments:
+        assert seg["start"] == int(seg["text"][5:])
+    starts = [s["start"] for s in result.segments]
+    assert starts == sorted(starts)
+    assert result.duration == 10.0
+
+
+def test_duration_falls_back_to_last_segment_end():
+    class NoDuration(FakeWhisper):
+        def create(self, **kwargs):
+            res = super().create(**kwargs)
+            del res["duration"]
+            return res
+
+    engine = TranscriptionEngine(NoDuration(), normalize=False)
+    # geen WAV: de engine kan de duur niet lokaal bepalen
+    result = engine.transcribe("kort.mp3", ramp_wav(3))
+    assert result.duration == 3.0
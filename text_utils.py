@@ -0,0 +1,58 @@
+"""
+Teksthulpfuncties: woorden, token-schatting, zinsgrenzen en compacte JSON.
+"""
+import json
+import math
+import re
+
+CHARS_PER_TOKEN = 3.5  # ruwe schatting voor Nederlandse tekst (Llama-tokenizer)
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?…])\s+")
+# woorden incl. diakrieten, met interne apostrof/koppelteken (zo'n, auto's, e-mail),
+# plus verkortingen met een apostrof vooraan ('s avonds, 't huis, 'n keer, 'k denk)
+_WORD_RE = re.compile(r"(?<![^\W_])'(?:s|t|n|k|m|r|ie)(?![^\W_'-])|[^\W_]+(?:['-][^\W_]+)*")
+_APOSTROPHES = str.maketrans({"’": "'", "‘": "'", "ʼ": "'", "`": "'"})
+
+
+def tokenize(text):
+    """Woorden in kleine letters, zonder leestekens; krullende apostroffen worden '."""
+    return _WORD_RE.findall(text.lower().translate(_APOSTROPHES))
+
+
+def estimate_tokens(text):
+    """Schat het aantal tokens zonder tokenizer (aan de veilige kant)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def compact_json(obj):
+    """JSON zonder inspringing en spaties: zelfde inhoud, minder tokens."""
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def split_windows(text, max_tokens):
+    """
+    Verdeelt tekst in vensters van hoogstens `max_tokens` (geschat).
+    Er wordt op zinsgrenzen geknipt; alleen een zin die zelf te lang is
+    wordt op woordgrenzen opgesplitst.
+    """
+    max_chars = max(1, int(max_tokens * CHARS_PER_TOKEN))
+    pieces = []
+    for sentence in _SENTENCE_RE.split(text.strip()):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if sentence:
+            pieces.append(sentence)
+
+    windows, current = [], ""
+    for piece in pieces:
+        candidate = f"{current} {piece}" if current else piece
+        if len(candidate) > max_chars and current:
+            windows.append(current)
+            candidate = piece
+        current = candidate
+    if current:
+        windows.append(current)
+    return windows
@@ -0,0 +1,89 @@
+"""
+Tijdmeting per pijplijnstap als gestructureerde log.
+
+Iedere stap (upload, voorbewerking, transcriptie, verrijking, analyse) logt
+één JSON-regel via de logger `speech2text.timing`, met minstens `stage`,
+`duration_ms` en `status`. De app schrijft die regels naar stderr of een
+JSONL-bestand; de benchmark vangt dezelfde records op met een
+TimingCollector, zodat productie en benchmark direct vergelijkbaar zijn.
+"""
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("speech2text.timing")
+logger.setLevel(logging.INFO)
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def emit(name, duration_s, status="ok", **fields):
+    """Logt één afgeronde stap."""
+    record = {"stage": name, "duration_ms": round(duration_s * 1000, 2), "status": status, **fields}
+    logger.info(json.dumps(record, ensure_ascii=False, default=str), extra={"timing": record})
+
+
+@contextmanager
+def stage(name, **fields):
+    """
+    Meet de duur van het blok. Het opgeleverde dict kan binnen het blok
+    aangevuld worden met extra velden (bijv. bytes of tokens).
+    """
+    extra = dict(fields)
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield extra
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        emit(name, time.perf_counter() - started, status, **extra)
+
+
+def configure(path=None):
+    """
+    Stuurt de timing-log naar `path` (JSONL) of anders naar stderr.
+    Meerdere aanroepen per proces zijn onschuldig.
+    """
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+        handler = logging.FileHandler(path, encoding="utf-8") if path else logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+        _configured = True
+
+
+class TimingCollector(logging.Handler):
+    """Verzamelt timing-records in het geheugen (voor benchmarks en tests)."""
+
+    def __init__(self):
+        super().__init__(level=logging.INFO)
+        self.records = []
+        self._records_lock = threading.Lock()
+
+    def emit(self, record):
+        timing = getattr(record, "timing", None)
+        if timing is not None:
+            with self._records_lock:
+                self.records.append(timing)
+
+    def __enter__(self):
+        logger.addHandler(self)
+        return self
+
+    def __exit__(self, *exc):
+        logger.removeHandler(self)
+
+    def durations(self):
+        """{stap: [duur in ms, ...]} over alle verzamelde records."""
+        out = {}
+        for r in self.records:
+            out.setdefault(r["stage"], []).append(r["duration_ms"])
+        return out
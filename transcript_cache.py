@@ -0,0 +1,168 @@
+"""
+Persistente transcriptie-cache.
+
+Transcripties worden opgeslagen in één SQLite-bestand dat door alle
+Streamlit-sessies en processen gedeeld wordt. De sleutel is een hash van de
+audio-bytes plus het model en de parameters, zodat een identieke upload
+direct (zonder netwerk-call) het eerdere resultaat teruggeeft.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MB aan transcripties
+
+
+def default_cache_path():
+    """
+    Pad naar het cache-bestand.
+    1) Map uit omgevingsvariabele SPEECH2TEXT_CACHE_DIR
+    2) Fallback op ~/.cache/speech2text
+    """
+    base = os.getenv("SPEECH2TEXT_CACHE_DIR", "").strip()
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache", "speech2text")
+    return os.path.join(base, "transcripts.sqlite3")
+
+
+def audio_hash(data):
+    """SHA-256 van de ruwe audio-bytes (hex)."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_key(data, model, params=None):
+    """Cache-sleutel voor audio + model + (gesorteerde) parameters."""
+    payload = json.dumps(
+        {"audio": audio_hash(data), "model": model, "params": params or {}},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TranscriptCache:
+    """
+    SQLite-store met LRU-eviction op totale grootte.
+
+    Iedere operatie opent een eigen verbinding, zodat de cache veilig vanuit
+    meerdere threads en processen gebruikt kan worden (WAL-modus).
+    Hit/miss/eviction-tellers staan ook in de database, dus `stats()` geeft
+    de totalen over alle processen heen.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or default_cache_path()
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_last_access"
+                " ON entries (last_access)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS stats ("
+                " name TEXT PRIMARY KEY,"
+                " value INTEGER NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def _bump(conn, name, amount=1):
+        conn.execute(
+            "INSERT INTO stats (name, value) VALUES (?, ?)"
+            " ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def get(self, key):
+        """Geeft het opgeslagen resultaat (dict) of None bij een miss."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT value FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._bump(conn, "misses")
+                return None
+            conn.execute(
+                "UPDATE entries SET last_access = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            self._bump(conn, "hits")
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        """Slaat een JSON-serialiseerbaar resultaat op en ruimt daarna op."""
+        blob = json.dumps(value, ensure_ascii=False)
+        size = len(blob.encode("utf-8"))
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries"
+                    " (key, value, size, created, last_access)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, blob, size, now, now),
+                )
+                self._evict(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self, conn):
+        total = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        rows = conn.execute(
+            "SELECT key, size FROM entries ORDER BY last_access ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        if evicted:
+            self._bump(conn, "evictions", evicted)
+
+    def stats(self):
+        """Tellers plus huidige omvang van de cache."""
+        with closing(self._connect()) as conn:
+            counters = dict(conn.execute("SELECT name, value FROM stats"))
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return {
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "evictions": counters.get("evictions", 0),
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def clear(self):
+        """Verwijdert alle entries en zet de tellers op nul."""
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM stats")
@@ -0,0 +1,256 @@
+"""
+Transcriptie van audio via de Groq Whisper-API.
+
+Uploads worden eerst lokaal genormaliseerd (mono, 16 kHz, compact
+formaat). Lange opnames worden op stille momenten in stukken onder de
+API-limiet geknipt, parallel getranscribeerd en daarna in volgorde aan
+elkaar gezet (met tijdstempel-correctie en ontdubbeling van de overlap).
+
+`transcribe_audio` is het gedeelde codepad voor de Streamlit-app en andere
+entry points: eerst de persistente cache raadplegen, pas bij een miss de API
+aanroepen.
+"""
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from audio import TARGET_RATE, codec, decode, encode, normalize, split_points
+from timing import stage
+from transcript_cache import make_key
+
+DEFAULT_MODEL = "whisper-large-v3"
+DEFAULT_MAX_CHUNK_BYTES = 24 * 1024 * 1024  # API-limiet is 25 MB per bestand
+WAV_HEADER_BYTES = 44
+
+_WORD_RE = re.compile(r"\w+")
+
+
+@dataclass
+class TranscriptResult:
+    text: str
+    segments: list = field(default_factory=list)  # dicts met start/end/text
+    duration: float = None
+    cached: bool = False
+    upload: dict = None  # original_bytes/sent_bytes/preprocess_s, niet gecachet
+
+    def to_dict(self):
+        return {"text": self.text, "segments": self.segments, "duration": self.duration}
+
+    @classmethod
+    def from_dict(cls, data, cached=False):
+        return cls(
+            text=data["text"],
+            segments=data.get("segments", []),
+            duration=data.get("duration"),
+            cached=cached,
+        )
+
+
+def _field(obj, name, default=None):
+    """Leest een veld uit een API-object of een (fake) dict-respons."""
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def _strip_overlap(prev_text, next_text, max_words=20):
+    """
+    Verwijdert het begin van `next_text` dat letterlijk gelijk is aan het
+    einde van `prev_text` (woorden vergeleken zonder hoofdletters/leestekens).
+    """
+    prev = [w.lower() for w in _WORD_RE.findall(prev_text)][-max_words:]
+    tokens = next_text.split()
+    norm = [" ".join(_WORD_RE.findall(t.lower())) for t in tokens[:max_words]]
+    for k in range(min(len(prev), len(norm)), 0, -1):
+        if prev[-k:] == norm[:k]:
+            return " ".join(tokens[k:])
+    return next_text.strip()
+
+
+class TranscriptionEngine:
+    """
+    Splitst, verstuurt en hecht transcripties.
+
+    `client` is alles met `client.audio.transcriptions.create(...)`, dus ook
+    een fake client die vaste segmenten teruggeeft.
+    """
+
+    def __init__(
+        self,
+        client,
+        model=DEFAULT_MODEL,
+        max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES,
+        max_workers=4,
+        overlap_s=1.0,
+        search_s=30.0,
+        normalize=True,
+        sample_rate=TARGET_RATE,
+        **params
+    ):
+        self.client = client
+        self.model = model
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_workers = max_workers
+        self.overlap_s = overlap_s
+        self.search_s = search_s
+        self.normalize = normalize
+        self.sample_rate = sample_rate
+        self.params = params
+
+    def config(self):
+        """Instellingen die de uitkomst bepalen (voor de cache-sleutel)."""
+        return {
+            "max_chunk_bytes": self.max_chunk_bytes,
+            "overlap_s": self.overlap_s,
+            "search_s": self.search_s,
+            "normalize": self.normalize and {"rate": self.sample_rate, "codec": codec()},
+            **self.params,
+        }
+
+    def _request(self, name, payload, offset):
+        """Eén API-call; geeft (segmenten met absolute tijden, duur volgens de API)."""
+        with stage("transcribe_request", model=self.model, bytes=len(payload)):
+            res = self.client.audio.transcriptions.create(
+                model=self.model,
+                file=(name, payload),
+                response_format="verbose_json",
+                **self.params
+            )
+        segments = [
+            {
+                "start": float(_field(s, "start", 0.0)) + offset,
+                "end": float(_field(s, "end", 0.0)) + offset,
+                "text": _field(s, "text", "").strip(),
+            }
+            for s in _field(res, "segments") or []
+        ]
+        duration = _field(res, "duration")
+        duration = float(duration) if duration is not None else None
+        if not segments:
+            segments = [{"start": offset, "end": offset + (duration or 0.0),
+                         "text": _field(res, "text", "").strip()}]
+        return segments, duration
+
+    def plan(self, clip):
+        """
+        Verdeelt een clip in stukken: lijst van (start, knip, stop) in frames.
+        Het stuk loopt van `start` (incl. overlap) tot `stop`; alles vóór
+        `knip` is al door het vorige stuk afgedekt. De omvang wordt op
+        16-bit PCM begroot, dus FLAC-stukken blijven zeker onder de limiet.
+        """
+        bytes_per_frame = clip.channels * 2
+        budget = (self.max_chunk_bytes - WAV_HEADER_BYTES) // bytes_per_frame
+        overlap = int(self.overlap_s * clip.rate)
+        max_frames = budget - overlap
+        if max_frames <= 0:
+            raise ValueError("max_chunk_bytes is te klein voor de gekozen overlap")
+        search = min(int(self.search_s * clip.rate), max_frames // 2)
+        bounds = split_points(clip, max_frames, search)
+        return [
+            (max(0, cut - overlap), cut, stop)
+            for cut, stop in zip(bounds[:-1], bounds[1:])
+        ]
+
+    def transcribe(self, name, data, progress=None):
+        """
+        Transcribeert een volledige opname en geeft een TranscriptResult.
+        `progress(fractie)` wordt na ieder afgerond stuk aangeroepen.
+        """
+        started = time.perf_counter()
+        stem = name.rsplit(".", 1)[0]
+        clip, fmt, single = None, None, data
+        if self.normalize:
+            with stage("preprocess", bytes_in=len(data)) as log:
+                prep = normalize(data, self.sample_rate)
+                if prep is not None:
+                    clip, fmt, single = prep.clip, prep.fmt, prep.data
+                log["bytes_out"] = len(single)
+        if len(single) > self.max_chunk_bytes and clip is None:
+            clip, fmt = decode(data), "wav"
+            if clip is None:
+                raise ValueError(
+                    f"Bestand is groter dan {self.max_chunk_bytes // (1024 * 1024)} MB "
+                    "en kan niet gedecodeerd worden om te splitsen "
+                    "(installeer ffmpeg of soundfile)."
+                )
+
+        if len(single) <= self.max_chunk_bytes:
+            fname = name if single is data else f"{stem}.{fmt}"
+            upload = self._upload_stats(data, [single], started)
+            segments, duration = self._request(fname, single, 0.0)
+            if progress:
+                progress(1.0)
+            # zonder lokale decoder (bijv. mp3 zonder ffmpeg) is de API de enige bron
+            result = self._stitch([(0.0, segments)], clip.duration if clip else duration)
+            result.upload = upload
+            return result
+
+        chunks = self.plan(clip)
+        payloads = [encode(clip.slice(start, stop), fmt) for start, _, stop in chunks]
+        upload = self._upload_stats(data, payloads, started)
+        done = [0]
+        lock = threading.Lock()
+
+        def run(i):
+            start, cut, _ = chunks[i]
+            segments, _ = self._request(f"{stem}_{i:03d}.{fmt}", payloads[i], start / clip.rate)
+            if progress:
+                with lock:
+                    done[0] += 1
+                    progress(done[0] / len(chunks))
+            return cut / clip.rate, segments
+
+        workers = max(1, min(self.max_workers, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(run, range(len(chunks))))
+        result = self._stitch(parts, clip.duration)
+        result.upload = upload
+        return result
+
+    @staticmethod
+    def _upload_stats(data, payloads, started):
+        return {
+            "original_bytes": len(data),
+            "sent_bytes": sum(len(p) for p in payloads),
+            "preprocess_s": time.perf_counter() - started,
+        }
+
+    @staticmethod
+    def _stitch(parts, duration):
+        merged = []
+        for cut, segments in parts:
+            # segmenten die volledig in de overlap vallen heeft het vorige stuk al
+            segments = [s for s in segments if s["end"] > cut + 0.05] if merged else segments
+            for seg in segments:
+                if merged and seg["start"] < cut + 0.05:
+                    seg = dict(seg, text=_strip_overlap(merged[-1]["text"], seg["text"]))
+                if seg["text"]:
+                    merged.append(seg)
+        text = " ".join(s["text"] for s in merged)
+        if duration is None and merged:
+            duration = merged[-1]["end"]
+        return TranscriptResult(text=text, segments=merged, duration=duration)
+
+
+def transcribe_audio(client, name, data, *, model=DEFAULT_MODEL, cache=None, progress=None, **options):
+    """
+    Transcribeert `data` (bytes van bestand `name`).
+    `options` gaan naar de TranscriptionEngine en tellen mee in de
+    cache-sleutel.
+    """
+    engine = TranscriptionEngine(client, model=model, **options)
+    with stage("transcribe", model=model, bytes=len(data)) as log:
+        key = make_key(data, model, engine.config()) if cache is not None else None
+        hit = cache.get(key) if key is not None else None
+        log["cached"] = hit is not None
+        if hit is not None:
+            return TranscriptResult.from_dict(hit, cached=True)
+
+        result = engine.transcribe(name, data, progress=progress)
+        if key is not None:
+            cache.put(key, result.to_dict())
+        log["sent_bytes"] = result.upload["sent_bytes"]
+        log["audio_s"] = result.duration
+        return result